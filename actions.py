@@ -44,9 +44,7 @@ class MovementAction(Action):
 
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             raise ValueError("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
-            raise ValueError("That way is blocked.")
-        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
+        if self.engine.game_map.is_blocked(dest_x, dest_y):
             raise ValueError("That way is blocked.")
 
         # move_signal.send(
@@ -110,7 +108,7 @@ class PickupAction(Action):
             if len(inventory.items) >= inventory.capacity:
                 raise ValueError("Your inventory is full.")
 
-            self.engine.game_map.entities.remove(self.item)
+            self.engine.game_map.remove_entity(self.item)
             # item.parent = self.entity.inventory
             inventory.items.append(self.item)
 
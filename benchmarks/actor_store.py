@@ -0,0 +1,55 @@
+"""Per-tick bookkeeping of many actors, object by object and through the ActorStore.
+
+Run from the repository root: python -m benchmarks.actor_store
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from components.needs import update_needs
+from engine import Engine
+from example.entity_factories import create_orc
+from game_map.island_generator import generate_island
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=600, help="Width and height of the map.")
+    parser.add_argument("--actors", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    island = generate_island(args.size, args.size)
+    Engine.instance(game_map=island)
+    rng = np.random.default_rng(args.seed)
+    xs, ys = island.sample_free_cells(args.actors, rng)
+    actors = island.spawn_many(xs, ys, create_orc)
+    print(f"{len(actors)} actors")
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        for actor in actors:
+            actor.needs.update()
+        positions = [(actor.x, actor.y) for actor in actors]
+    print(f"objects: {(time.perf_counter() - start) / args.ticks * 1000:.2f} ms per tick")
+
+    start = time.perf_counter()
+    store = island.enable_actor_store()
+    print(f"enable_actor_store: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        update_needs(store)
+        positions = np.stack([store.x, store.y], axis=1)
+    print(f"store: {(time.perf_counter() - start) / args.ticks * 1000:.2f} ms per tick")
+
+    assert len(positions) == len(actors)
+    assert actors[0].needs.hunger == min(2 * args.ticks, actors[0].needs.max_hunger)
+
+
+if __name__ == "__main__":
+    main()
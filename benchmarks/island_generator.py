@@ -0,0 +1,87 @@
+"""Vectorized island generation against the former per-cell loop.
+
+Run from the repository root: python -m benchmarks.island_generator
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from game_map import tile_types
+from game_map.game_map import GameMap
+from game_map.island_generator import IslandSettings, generate_heightmap, generate_island
+
+
+def generate_island_loop(map_width: int, map_height: int) -> GameMap:
+    """The original implementation, classifying one cell at a time."""
+    settings = IslandSettings()
+    height_map = generate_heightmap(
+        width=map_width,
+        height=map_height,
+        scale=settings.scale,
+        octaves=settings.octaves,
+        lacunarity=settings.lacunarity,
+        seed=settings.seed,
+    )
+
+    x_center = map_width // 2
+    y_center = map_height // 2
+
+    island = GameMap(map_width, map_height)
+    for x in range(map_width):
+        for y in range(map_height):
+            len_from_center_x = abs(x_center - x) / x_center
+            len_from_center_y = abs(y_center - y) / y_center
+
+            h = height_map[y][x] * (1 - max(len_from_center_x, len_from_center_y))
+
+            if x == 0 or y == 0 or x == map_width - 1 or y == map_height - 1:
+                island.tiles[x, y] = tile_types.WATER
+            elif h < 0.15:
+                island.tiles[x, y] = tile_types.WATER
+            elif h < 0.2:
+                island.tiles[x, y] = tile_types.SAND
+            elif h > 0.7:
+                island.tiles[x, y] = tile_types.MOUNTAIN
+            elif 0.4 < h < 0.7:
+                island.tiles[x, y] = tile_types.FORREST
+            else:
+                island.tiles[x, y] = tile_types.GRASS
+
+    island.tiles_changed()
+    return island
+
+
+def measure(function, width: int, height: int) -> tuple[float, GameMap]:  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    island = function(width, height)
+    return time.perf_counter() - start, island
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", default=["160x100", "2000x2000", "10000x10000"])
+    parser.add_argument(
+        "--loop-max-cells",
+        type=int,
+        default=4_000_000,
+        help="Skip the loop for larger maps, it takes minutes there.",
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>12} {'loop, s':>10} {'vectorized, s':>14} {'speedup':>8}")
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        vectorized, island = measure(generate_island, width, height)
+        if width * height > args.loop_max_cells:
+            print(f"{size:>12} {'-':>10} {vectorized:>14.3f} {'-':>8}")
+            continue
+        del island
+        loop, expected = measure(generate_island_loop, width, height)
+        _, island = measure(generate_island, width, height)
+        assert (island.tiles == expected.tiles).all(), "Vectorized generation differs from the loop"
+        print(f"{size:>12} {loop:>10.3f} {vectorized:>14.3f} {loop / vectorized:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
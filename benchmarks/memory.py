@@ -0,0 +1,65 @@
+"""Memory taken by entities and observations.
+
+Run from the repository root: python -m benchmarks.memory
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+import argparse
+import gc
+import tracemalloc
+
+from components.consumable import Food
+from components.observation_log import Observation
+from engine import Engine
+from entity import Item
+from events.map_events import SpawnEvent
+from example.entity_factories import create_orc
+from example.tree import Tree
+from game_map.game_map import GameMap
+
+
+def bytes_per_object(count: int, create: Callable[[int], object]) -> float:
+    """Return the memory allocated per object by `count` calls to `create`, keeping all objects alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [create(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the objects is not part of their cost.
+    overhead = objects.__sizeof__()
+    del objects
+    return (after - before - overhead) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=100_000)
+    parser.add_argument("--actors", type=int, default=10_000)
+    parser.add_argument("--observations", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    Engine.instance(game_map=GameMap(100, 100))
+    apple = Item(name="Apple", char="a", x=0, y=0, color=(255, 0, 0), consumable=Food("Apple", 10, 8))
+    event = SpawnEvent(0, 0, apple)
+
+    print(f"Tree: {bytes_per_object(args.entities, lambda i: Tree(i, i)):.0f} bytes")
+    apple_bytes = bytes_per_object(
+        args.entities,
+        lambda i: Item(name="Apple", char="a", x=i, y=i, color=(255, 0, 0), consumable=Food("Apple", 10, 8)),
+    )
+    print(f"Item with its consumable: {apple_bytes:.0f} bytes")
+    print(f"Actor with its components: {bytes_per_object(args.actors, lambda i: create_orc(i, i)):.0f} bytes")
+    print(f"Event: {bytes_per_object(args.entities, lambda i: SpawnEvent(i, i, apple)):.0f} bytes")
+    observation_bytes = bytes_per_object(
+        args.observations,
+        lambda i: Observation(f"Apple appeared at [{i % 1000}, {i // 1000}]"),
+    )
+    print(f"Observation with its own text ({args.observations}): {observation_bytes:.0f} bytes")
+    observation_bytes = bytes_per_object(args.observations, lambda i: Observation(event=event))
+    print(f"Observation of an event ({args.observations}): {observation_bytes:.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
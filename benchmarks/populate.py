@@ -0,0 +1,47 @@
+"""Bulk population of a large island.
+
+Run from the repository root: python -m benchmarks.populate
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from engine import Engine
+from example.entity_factories import create_orc
+from example.populate_island import populate_island
+from example.tree import Tree
+from game_map.island_generator import generate_island
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000, help="Width and height of the map.")
+    parser.add_argument("--trees", type=int, default=100_000)
+    parser.add_argument("--actors", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    island = generate_island(args.size, args.size)
+    Engine.instance(game_map=island)
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    populate_island(island, seed=args.seed)
+    print(f"populate_island: {time.perf_counter() - start:.3f} s, {len(island.entities)} entities")
+
+    start = time.perf_counter()
+    xs, ys = island.sample_free_cells(args.trees, rng)
+    island.spawn_many(xs, ys, Tree)
+    print(f"{len(xs)} trees: {time.perf_counter() - start:.3f} s")
+
+    start = time.perf_counter()
+    xs, ys = island.sample_free_cells(args.actors, rng)
+    island.spawn_many(xs, ys, create_orc)
+    print(f"{len(xs)} actors: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
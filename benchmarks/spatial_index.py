@@ -0,0 +1,56 @@
+"""Point lookup cost of GameMap with growing entity counts.
+
+Run from the repository root: python -m benchmarks.spatial_index
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from components.consumable import Food
+from entity import Item
+from example.tree import Tree
+from game_map.game_map import GameMap
+
+
+def populate(game_map: GameMap, count: int, rng: random.Random) -> None:
+    for i in range(count):
+        x = rng.randrange(game_map.width)
+        y = rng.randrange(game_map.height)
+        if i % 2:
+            game_map.spawn_interactable(Tree(x, y))
+        else:
+            game_map.spawn_item(
+                Item(name="Apple", char="a", x=x, y=y, color=(255, 0, 0), consumable=Food("Apple", 10, 8))
+            )
+
+
+def time_lookups(game_map: GameMap, lookups: int, rng: random.Random) -> float:
+    """Return the mean time of one lookup in microseconds."""
+    points = [(rng.randrange(game_map.width), rng.randrange(game_map.height)) for _ in range(lookups)]
+    start = time.perf_counter()
+    for x, y in points:
+        game_map.get_blocking_entity_at_location(x, y)
+        game_map.get_item_at_location(x, y)
+        game_map.get_interactable_at_location(x, y)
+    return (time.perf_counter() - start) / (3 * lookups) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=500, help="Width and height of the map.")
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'entities':>10} {'us/lookup':>10}")
+    for count in [10, 100, 1_000, 10_000, 100_000]:
+        rng = random.Random(args.seed)
+        game_map = GameMap(args.size, args.size)
+        populate(game_map, count, rng)
+        print(f"{count:>10} {time_lookups(game_map, args.lookups, rng):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
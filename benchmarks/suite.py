@@ -0,0 +1,265 @@
+"""Timings of the hot paths of the engine over a sweep of map sizes and entity counts.
+
+Every scenario is built from fixed seeds, so runs on different commits measure the same worlds.
+Results are written as JSON to compare them across commits.
+
+Run from the repository root: python -m benchmarks.suite --output results.json
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import tcod
+
+from actions import MovementAction
+from engine import Engine
+from entity import Actor
+from events.map_events import SpawnEvent
+from example.entity_factories import create_health_potion, create_orc, explore_ai
+from example.populate_island import populate_island
+from example.tree import Tree
+from game_map.game_map import GameMap
+from game_map.island_generator import IslandSettings, generate_island
+from harnesses.base_harness import BaseHarness
+from harnesses.explore_harness import ExploreHarness
+from logs import configure_logging
+
+BENCHMARKS = (
+    "generate_island",
+    "populate_island",
+    "tick",
+    "update_fov",
+    "handle_event",
+    "get_path_to",
+    "walk_path",
+    "create_dijkstra_map",
+    "render",
+)
+
+
+def summarize(seconds: list[float]) -> dict[str, float]:
+    return {
+        "min": min(seconds),
+        "median": statistics.median(seconds),
+        "mean": statistics.fmean(seconds),
+        "max": max(seconds),
+    }
+
+
+def measure(run: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> dict[str, float]:
+    """Time `repeat` calls of `run`, calling `setup` untimed before each of them."""
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    return summarize(seconds)
+
+
+def create_explorer(x: int, y: int) -> Actor:
+    orc = create_orc(x, y)
+    orc.ai = explore_ai(orc)
+    return orc
+
+
+def build_world(size: int, count: int, seed: int) -> GameMap:
+    """Return a populated island with `count` exploring actors, items and trees on top of the example population."""
+    island = generate_island(size, size, IslandSettings(seed=seed))
+    Engine.reset()
+    Engine.instance(game_map=island)
+    populate_island(island, seed=seed, human_ai=explore_ai)
+
+    rng = np.random.default_rng(seed)
+    island.spawn_many(*island.sample_free_cells(count, rng), create_explorer)
+    island.spawn_many(*island.sample_free_cells(count, rng), create_health_potion)
+    island.spawn_many(*island.sample_free_cells(count, rng), Tree)
+    island.update_fov()
+    return island
+
+
+def result(name: str, island: GameMap, count: int | None, seconds: dict[str, float]) -> dict[str, Any]:
+    return {
+        "benchmark": name,
+        "size": island.width,
+        "count": count,
+        "actors": len(island.actors),
+        "items": len(island.items),
+        "interactables": len(island.interactables),
+        "seconds": seconds,
+    }
+
+
+def run_generation(size: int, args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Time building the world, which depends only on the size of the map."""
+    results = []
+    settings = IslandSettings(seed=args.seed)
+    if "generate_island" in args.benchmarks:
+        seconds = measure(lambda: generate_island(size, size, settings), args.repeat)
+        results.append(result("generate_island", GameMap(size, size), None, seconds))
+
+    if "populate_island" in args.benchmarks:
+        islands: list[GameMap] = []
+
+        def fresh_island() -> None:
+            islands.append(generate_island(size, size, settings))
+            Engine.reset()
+            Engine.instance(game_map=islands[-1])
+
+        seconds = measure(
+            lambda: populate_island(islands[-1], seed=args.seed, human_ai=explore_ai), args.repeat, fresh_island
+        )
+        results.append(result("populate_island", islands[-1], None, seconds))
+    return results
+
+
+def run_scenario(size: int, count: int, args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Time the benchmarks which run on a populated world. Each of them is timed per call, `tick` per tick."""
+    island = build_world(size, count, args.seed)
+    engine = Engine.instance()
+    rng = np.random.default_rng(args.seed)
+    human = min(island.actors, key=lambda actor: actor.id)
+    walkable_x, walkable_y = np.nonzero(island.walkable)
+    picked = rng.integers(len(walkable_x), size=args.repeat)
+    # Cells where events happen and paths lead to.
+    cells = list(zip(walkable_x[picked].tolist(), walkable_y[picked].tolist()))
+    timings: dict[str, dict[str, float]] = {}
+    # Extra fields of the results of some benchmarks.
+    details: dict[str, dict[str, Any]] = {}
+
+    if "update_fov" in args.benchmarks:
+
+        def invalidate_fovs() -> None:
+            # FOVs and cached results are keyed by the transparency version, so this makes every FOV stale.
+            island.transparency_version += 1
+
+        timings["update_fov"] = measure(island.update_fov, args.repeat, invalidate_fovs)
+
+    if "handle_event" in args.benchmarks:
+        apple = create_health_potion(0, 0)
+        events = iter([SpawnEvent(x, y, apple) for x, y in cells])
+        timings["handle_event"] = measure(lambda: island.handle_event(next(events)), args.repeat)
+
+    if "get_path_to" in args.benchmarks:
+        harness = ExploreHarness(human)
+        destinations = iter(cells)
+        timings["get_path_to"] = measure(lambda: harness.get_path_to(*next(destinations)), args.repeat)
+
+    if "walk_path" in args.benchmarks:
+        # Walks an actor along cached paths, one step per call, picking the next destination on arrival.
+        # The human may stand on an unwalkable tile of the center of the map.
+        actor = min((a for a in island.actors if island.walkable[a.x, a.y]), key=lambda a: a.id)
+        walker = ExploreHarness(actor)
+        distances = tcod.path.maxarray((island.width, island.height), dtype=np.int32, order="F")
+        distances[actor.x, actor.y] = 0
+        tcod.path.dijkstra2d(distances, island.walkable.view(np.int8), 1, 1, out=distances)
+        reachable_x, reachable_y = np.nonzero(distances != np.iinfo(np.int32).max)
+        picked = rng.integers(len(reachable_x), size=args.walk_steps)
+        destinations = zip(reachable_x[picked].tolist(), reachable_y[picked].tolist())
+        destination = [next(destinations)]
+        stats = BaseHarness.path_cache_stats
+        hits, misses = stats.hits, stats.misses
+
+        def walk() -> None:
+            path = walker.get_path_to(*destination[0])
+            try:
+                MovementAction(actor, path[0][0] - actor.x, path[0][1] - actor.y).perform()
+            except (IndexError, ValueError):  # Arrived, no path or the destination is occupied.
+                destination[0] = next(destinations, destination[0])
+
+        timings["walk_path"] = measure(walk, args.walk_steps)
+        details["walk_path"] = {"path_cache_hits": stats.hits - hits, "path_cache_misses": stats.misses - misses}
+
+    if "create_dijkstra_map" in args.benchmarks:
+        harness = ExploreHarness(human)
+
+        def forget_exploration_map() -> None:
+            island.exploration_maps.pop(human, None)
+
+        timings["create_dijkstra_map"] = measure(harness.create_dijkstra_map, args.repeat, forget_exploration_map)
+
+    if "render" in args.benchmarks:
+        console = tcod.Console(island.width, island.height, order="F")
+        timings["render"] = measure(lambda: island.render(console), args.repeat, console.clear)
+
+    # Ticking changes the world, so it runs last.
+    if "tick" in args.benchmarks:
+        engine.tick()  # The first tick computes what later ticks only update.
+        timings["tick"] = measure(engine.tick, args.ticks)
+
+    return [result(name, island, count, seconds) | details.get(name, {}) for name, seconds in timings.items()]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000], help="Widths and heights of maps.")
+    parser.add_argument(
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Numbers of actors, items and trees added to the example population of each map.",
+    )
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per benchmark.")
+    parser.add_argument("--ticks", type=int, default=50, help="Timed ticks per scenario.")
+    parser.add_argument("--walk-steps", type=int, default=200, help="Timed steps of walk_path per scenario.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", metavar="PATH", help="Write results as JSON to this file.")
+    parser.add_argument("--log-level", default="WARNING", help="Level of the logs, which go to the null device.")
+    args = parser.parse_args()
+
+    configure_logging(os.devnull, level=args.log_level)
+
+    results = []
+    print(f"{'benchmark':<20} {'size':>6} {'count':>6} {'median ms':>10} {'min ms':>10}")
+    for size in args.sizes:
+        scenarios = [run_generation(size, args), *(run_scenario(size, count, args) for count in args.counts)]
+        for row in (row for scenario in scenarios for row in scenario):
+            seconds = row["seconds"]
+            print(
+                f"{row['benchmark']:<20} {size:>6} {row['count'] or '-':>6}"
+                f" {seconds['median'] * 1e3:>10.3f} {seconds['min'] * 1e3:>10.3f}"
+                + (
+                    f"  path cache hits {row['path_cache_hits']} / {row['path_cache_hits'] + row['path_cache_misses']}"
+                    if "path_cache_hits" in row
+                    else ""
+                )
+            )
+            results.append(row)
+
+    if args.output is not None:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "tcod": tcod.__version__,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "ticks": args.ticks,
+            "walk_steps": args.walk_steps,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+import re
+import zlib
+
+from numpy.typing import NDArray
+import numpy as np
+
+# Turns a batch of texts into a (texts x dimensions) float32 matrix of unit-length rows.
+EmbeddingFunction = Callable[[Sequence[str]], NDArray[np.float32]]
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder based on the hashing trick.
+
+    Every token is hashed into one of `dimensions` buckets with a sign, so texts sharing words get similar vectors.
+    It needs no model and gives the same vectors in every process, unlike Python's salted `hash`.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    def __call__(self, texts: Sequence[str]) -> NDArray[np.float32]:
+        rows: list[int] = []
+        columns: list[int] = []
+        signs: list[float] = []
+        for row, text in enumerate(texts):
+            for token in TOKEN.findall(text.lower()):
+                digest = zlib.crc32(token.encode())
+                rows.append(row)
+                columns.append(digest % self.dimensions)
+                signs.append(1.0 if digest & 0x80000000 else -1.0)
+
+        embeddings = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(embeddings, (rows, columns), signs)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
+
+
+default_embedder = HashingEmbedder()
@@ -3,15 +3,28 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, cast
 
+import numpy as np
+
 from components.base_component import BaseComponent
-from events.internal_events import HealthLossEvent
+from events.internal_events import HEALTH_LOSS_1
 
 if TYPE_CHECKING:
     from entity import Actor
+    from game_map.actor_store import ActorStore
+
+
+# Need, and what an actor at its maximum complains about, for update_needs.
+NEEDS = (
+    ("hunger", "I am starving!"),
+    ("thirst", "I am dying of thirst!"),
+    ("sleepiness", "I am extremely tired!"),
+    ("lonliness", "I am extremely lonely!"),
+)
 
 
 # TODO it is very concrete, should be more abstract
 # Users should be able to pass custom stuff here
+# Values move into the ActorStore of the map when it has one, see game_map.actor_store.attach.
 @dataclass
 class Needs(BaseComponent):
     max_hp: int
@@ -21,12 +34,20 @@ class Needs(BaseComponent):
     max_sleepiness: int
     max_lonliness: int
 
+    # How much each need grows per tick.
+    hunger_rate: int = 1
+    thirst_rate: int = 1
+    sleepiness_rate: int = 1
+    lonliness_rate: int = 1
+
     hunger = 0
     thirst = 0
     sleepiness = 0
     lonliness = 0
 
     parent: Actor = field(init=False)
+    actor_store: ActorStore | None = field(default=None, init=False, repr=False, compare=False)
+    actor_slot: int = field(default=-1, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.hp = self.max_hp
@@ -37,31 +58,33 @@ Thirst: {self.thirst}/{self.max_thirst},\
 Sleepiness: {self.sleepiness}/{self.max_sleepiness},\
 Lonliness: {self.lonliness}/{self.max_lonliness}"
 
-    # TODO it shall be possible to have different change rates for different creatures
     def update(self):
-        self.hunger += 1
-        self.thirst += 1
-        self.sleepiness += 1
-        self.lonliness += 1
+        if self.actor_store is not None:
+            return  # Updated together with all other actors of the store by update_needs.
+
+        self.hunger += self.hunger_rate
+        self.thirst += self.thirst_rate
+        self.sleepiness += self.sleepiness_rate
+        self.lonliness += self.lonliness_rate
 
         if self.hunger >= self.max_hunger:
             self.parent.observation_log.add(text="I am starving!", event=None)
-            self.parent.handle_internal_event(HealthLossEvent(1))
+            self.parent.handle_internal_event(HEALTH_LOSS_1)
             self.hunger = self.max_hunger
 
         if self.thirst >= self.max_thirst:
             self.parent.observation_log.add(text="I am dying of thirst!", event=None)
-            self.parent.handle_internal_event(HealthLossEvent(1))
+            self.parent.handle_internal_event(HEALTH_LOSS_1)
             self.thirst = self.max_thirst
 
         if self.sleepiness >= self.max_sleepiness:
             self.parent.observation_log.add(text="I am extremely tired!", event=None)
-            self.parent.handle_internal_event(HealthLossEvent(1))
-            self.thirst = self.max_sleepiness
+            self.parent.handle_internal_event(HEALTH_LOSS_1)
+            self.sleepiness = self.max_sleepiness
 
         if self.lonliness >= self.max_lonliness:
             self.parent.observation_log.add(text="I am extremely lonely!", event=None)
-            self.parent.handle_internal_event(HealthLossEvent(1))
+            self.parent.handle_internal_event(HEALTH_LOSS_1)
             self.lonliness = self.max_lonliness
 
     # # TODO unify with hp etc.
@@ -74,3 +97,22 @@ Lonliness: {self.lonliness}/{self.max_lonliness}"
     #     self.parent.observation_log.add(
     #         text=f"I am less hungry and thirsty! Hunger now: {self.hunger}, Thirst now: {self.thirst}", event=None
     #     )
+
+
+def update_needs(store: ActorStore) -> None:
+    """Advance the needs of every actor in the store at once, like Needs.update does for one actor.
+
+    Events and observations are only sent to the actors which reached the maximum of a need.
+    """
+    alive = store.alive[: len(store.actors)]
+    for need, complaint in NEEDS:
+        values = getattr(store, need)
+        values += getattr(store, f"{need}_rate")
+        maximum = getattr(store, f"max_{need}")
+        reached = alive & (values >= maximum)
+        np.minimum(values, maximum, out=values)
+        for slot in np.flatnonzero(reached):
+            actor = store.actors[slot]
+            assert actor is not None
+            actor.observation_log.add(text=complaint, event=None)
+            actor.handle_internal_event(HEALTH_LOSS_1)
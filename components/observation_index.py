@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Hashable
+from typing import TYPE_CHECKING
+
+from events.map_events import BaseMapEvent
+
+if TYPE_CHECKING:
+    from events.base_event import BaseEvent
+
+# Width and height of the square cells observations are bucketed by for spatial queries.
+BUCKET_SIZE = 16
+
+
+def _window(sequences: list[int], low: int, high: int) -> list[int]:
+    """Return the part of sorted `sequences` in [low, high)."""
+    return sequences[bisect_left(sequences, low) : bisect_left(sequences, high)]
+
+
+def _contains(sequences: list[int], sequence: int) -> bool:
+    index = bisect_left(sequences, sequence)
+    return index < len(sequences) and sequences[index] == sequence
+
+
+class ObservationIndex:
+    """Inverted indexes from event types, ids of involved entities and spatial buckets to observations.
+
+    Observations are referred to by the sequence numbers of an ObservationLog. Those only grow, so every posting
+    list stays sorted and queries intersect them by bisection instead of scanning the log.
+    """
+
+    def __init__(self) -> None:
+        self.by_type: dict[type[BaseEvent], list[int]] = {}
+        self.by_entity: dict[int, list[int]] = {}
+        self.by_bucket: dict[tuple[int, int], list[int]] = {}
+
+    def add(self, sequence: int, event: BaseEvent | None) -> None:
+        if event is None:
+            return
+        self.by_type.setdefault(type(event), []).append(sequence)
+        for entity_id in {entity.id for entity in event.entities()}:
+            self.by_entity.setdefault(entity_id, []).append(sequence)
+        if isinstance(event, BaseMapEvent):
+            self.by_bucket.setdefault((event.x // BUCKET_SIZE, event.y // BUCKET_SIZE), []).append(sequence)
+
+    def prune(self, first: int) -> None:
+        """Forget observations before the sequence number `first`, e.g. ones evicted from the log."""
+        index: dict[Hashable, list[int]]
+        for index in (self.by_type, self.by_entity, self.by_bucket):  # type: ignore[assignment]
+            for key in list(index):
+                sequences = index[key]
+                del sequences[: bisect_left(sequences, first)]
+                if not sequences:
+                    del index[key]
+
+    def find(
+        self,
+        low: int,
+        high: int,
+        event_type: type[BaseEvent] | None = None,
+        entity_id: int | None = None,
+        near: tuple[int, int] | None = None,
+        radius: int = 0,
+    ) -> list[int] | None:
+        """Return sorted sequence numbers in [low, high) matching all given criteria, or None if none are given.
+
+        `near` matches every observation in the buckets within `radius` of the point, so it may include
+        observations a bit farther away.
+        """
+        candidates: list[list[int]] = []
+        if event_type is not None:
+            matching = [
+                _window(sequences, low, high)
+                for cls, sequences in self.by_type.items()
+                if issubclass(cls, event_type)
+            ]
+            candidates.append(sorted(sequence for sequences in matching for sequence in sequences))
+        if entity_id is not None:
+            candidates.append(_window(self.by_entity.get(entity_id, []), low, high))
+        if near is not None:
+            x, y = near
+            nearby: list[int] = []
+            for bucket_x in range((x - radius) // BUCKET_SIZE, (x + radius) // BUCKET_SIZE + 1):
+                for bucket_y in range((y - radius) // BUCKET_SIZE, (y + radius) // BUCKET_SIZE + 1):
+                    nearby.extend(_window(self.by_bucket.get((bucket_x, bucket_y), []), low, high))
+            candidates.append(sorted(nearby))
+        if not candidates:
+            return None
+
+        # Check the members of the shortest list against the others.
+        candidates.sort(key=len)
+        result, others = candidates[0], candidates[1:]
+        return [sequence for sequence in result if all(_contains(other, sequence) for other in others)]
@@ -1,37 +1,47 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, overload
 import textwrap
 
+from numpy.typing import NDArray
+import numpy as np
+
 from components.base_component import BaseComponent
+from components.embeddings import EmbeddingFunction, default_embedder
+from components.observation_index import ObservationIndex
 from engine import Engine
 from events.base_event import BaseEvent
-
-# from chromadb.utils import embedding_functions  # type: ignore
-
+from logs import get_logger
 
 if TYPE_CHECKING:
     from datetime import datetime
 
-    from chromadb.api.models.Collection import Collection  # type: ignore
+    from entity import Actor, Entity
 
-    from entity import Actor
+log = get_logger("observations")
 
 # Global counter. Could be a static variable of Observation class but it would be easier to shot yourself in the foot.
 observation_id: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class Observation:
-    """An observation made by an actor."""
+    """An observation made by an actor.
 
-    text: str
+    Only the tick and the event are stored. Text and game time are rendered when needed, and the text of an event
+    is shared by all of its observers.
+    """
+
+    # Text of observations which are not described by their event.
+    message: str | None = None
     event: BaseEvent | None = None
-    gametime: datetime = field(default_factory=lambda: Engine.instance().time)
+    tick: int = field(default_factory=lambda: Engine.instance().ticks)
     id: int = field(default_factory=lambda: Observation.get_id())
-    embedding: list[float] | None = None
+    # Number of observations merged into this one and the tick of the latest of them, see ObservationLog.
+    count: int = 1
+    last_tick: int | None = None
 
     @staticmethod
     def get_id() -> int:
@@ -39,75 +49,306 @@ class Observation:
         observation_id += 1
         return observation_id
 
+    @property
+    def text(self) -> str:
+        if self.count > 1:
+            ticks = self.end_tick - self.tick + 1
+            if self.event is not None:
+                return self.event.describe_repeated(self.count, ticks)
+            return f"{self.message} ({self.count} times over {ticks} ticks)"
+        if self.message is not None:
+            return self.message
+        assert self.event is not None
+        return self.event.describe()
+
+    def merge(self, other: Observation) -> bool:
+        """Merge a later observation into this one if they are repeats, and return whether it was merged."""
+        if self.message is not None or other.message is not None:
+            if self.message != other.message or self.event is not other.event:
+                return False
+        elif self.event is not None and other.event is not None:
+            event = self.event.merge(other.event)
+            if event is None:
+                return False
+            self.event = event
+        else:
+            return False
+        self.count += 1
+        self.last_tick = other.tick
+        return True
+
+    @property
+    def end_tick(self) -> int:
+        return self.tick if self.last_tick is None else self.last_tick
+
+    @property
+    def gametime(self) -> datetime:
+        return Engine.tick_to_time(self.tick)
+
     def __str__(self) -> str:
         formatted_datime = self.gametime.strftime("%y-%m-%d %H:%M")
         return f"[{formatted_datime}]: {self.text}"
 
 
-class ObservationLog(BaseComponent):
-    parent: Actor
-    emb_collection: Collection | None = None
+class ObservationView(Sequence[Observation]):
+    """Lazy view of consecutive observations of a log, rendered to text only by `str`.
 
-    def __init__(self, capacity: int) -> None:
-        self.capacity = capacity
-        self.observations: list[Observation] = []
+    Observations which the log evicts after the view was created are skipped.
+    """
 
-    def add(self, text: str, event: BaseEvent | None = None) -> None:
-        """Add a observation to this log."""
-        self.observations.append(Observation(text, event))
+    def __init__(self, log: ObservationLog, start: int, stop: int) -> None:
+        self.log = log
+        # Sequence numbers of the observations, see ObservationLog.
+        self.start, self.stop = start, stop
 
-        print(f"Observation added: {text}")
+    def _live_start(self) -> int:
+        return max(self.start, self.log.first)
 
-        if len(self.observations) > self.capacity:
-            self.observations.pop(0)
+    def __len__(self) -> int:
+        return max(0, self.stop - self._live_start())
 
-    def update(self) -> None:
-        return super().update()
+    @overload
+    def __getitem__(self, index: int) -> Observation: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ObservationView: ...
+
+    def __getitem__(self, index: int | slice) -> Observation | ObservationView:
+        start = self._live_start()
+        if isinstance(index, slice):
+            first, last, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Observation views do not support steps.")
+            return ObservationView(self.log, start + first, start + max(first, last))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Observation index out of range.")
+        return self.log.get(start + index)
+
+    def __iter__(self) -> Iterator[Observation]:
+        for sequence in range(self._live_start(), self.stop):
+            yield self.log.get(sequence)
 
     def __str__(self) -> str:
-        """Represent the log as text suitable for LLMs.
+        return "\n".join(map(str, self))
 
-        It is supposed to be overloaded by agents.
-        """
-        return str(self.observations)
 
-    # def make_embeddings(self) -> None:
-    #     """Generate embeddings for the observations in this log.
+class ObservationReport(Sequence[Observation]):
+    """Observations of a time window, from an ObservationStore as far as the log evicted them and then from the log.
 
-    #     Batched instead of on-the-fly generation for efficiency.
-    #     """
-    #     if self.emb_collection is None:
-    #         self.emb_collection = chroma_client.create_collection(
-    #             name=f"{self.parent.name}_collection".lower() if self.parent else "sample_collection",
-    #             embedding_function=_generate_embeddings,
-    #         )
+    `str` renders them as text, one line per entry.
+    """
 
-    #     observations_without_embeddings = [
-    #         observation for observation in self.observations if observation.embedding is None
-    #     ]
+    def __init__(self, stored: Sequence[Observation], live: ObservationView) -> None:
+        self.stored = stored
+        self.live = live
 
-    #     embeddings = _generate_embeddings([observation.text for observation in observations_without_embeddings])
+    def __len__(self) -> int:
+        return len(self.stored) + len(self.live)
 
-    #     self.emb_collection.add(
-    #         embeddings=embeddings,
-    #         documents=[str(observation) for observation in observations_without_embeddings],
-    #         ids=[str(observation.id) for observation in observations_without_embeddings],
-    #     )
+    @overload
+    def __getitem__(self, index: int) -> Observation: ...
 
-    # TODO probably it would make sense to properly store Observation objects in the database
-    # def query(self, text: str, amount: int = 1) -> list[str]:
-    #     if self.emb_collection is None:
-    #         self.make_embeddings()
-    #     assert self.emb_collection is not None
+    @overload
+    def __getitem__(self, index: slice) -> list[Observation]: ...
 
-    #     result = self.emb_collection.query(
-    #         query_embeddings=_generate_embeddings([text]),
-    #         n_results=amount,
-    #     )
+    def __getitem__(self, index: int | slice) -> Observation | list[Observation]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Observation index out of range.")
+        if index < len(self.stored):
+            return self.stored[index]
+        return self.live[index - len(self.stored)]
 
-    #     print(f"Query {text} result: {result}")
+    def __iter__(self) -> Iterator[Observation]:
+        yield from self.stored
+        yield from self.live
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self))
+
+
+class ObservationLog(BaseComponent):
+    """Bounded log of observations in a ring buffer, oldest observations are evicted first.
 
-    #     return result["documents"][0]  # type: ignore
+    Each added observation gets the next sequence number and is stored in slot `sequence % capacity`.
+    Observations are added in tick order, so time windows are found by bisecting the tick stamps.
+
+    With `coalesce` set, a new observation is merged into the latest entry of the same kind, the same text or
+    event type, if it repeats it, e.g. another HealthLossEvent, and the entry was last repeated this tick or the
+    one before. So an actor which starves every tick keeps one entry for its complaints and one for its health
+    loss, even though the two alternate. Merged entries keep the tick of their first observation, which is the one
+    entries are ordered and reports search by.
+    """
+
+    parent: Actor
+
+    def __init__(self, capacity: int, coalesce: bool = False, embedder: EmbeddingFunction = default_embedder) -> None:
+        self.capacity = capacity
+        self.coalesce = coalesce
+        self.embedder = embedder
+        # Embeddings of observations in the same slots, allocated on first query. See make_embeddings.
+        self._embeddings: NDArray[np.float32] | None = None
+        # Sequence number up to which observations are embedded.
+        self._embedded = 0
+        # Both grow up to the capacity and are then reused as a ring.
+        self._observations: list[Observation] = []
+        # Tick of the observation in the same slot, kept apart for bisection.
+        self._ticks: list[int] = []
+        # Sequence number of the next observation.
+        self.added = 0
+        self.index = ObservationIndex()
+        # Sequence number of the latest entry of each kind, see `_kind`. Only these entries are merged into.
+        self._latest: dict[tuple[str | None, type[BaseEvent] | None], int] = {}
+
+    def __len__(self) -> int:
+        return min(self.added, self.capacity)
+
+    @property
+    def first(self) -> int:
+        """Sequence number of the oldest observation in the log."""
+        return self.added - len(self)
+
+    @property
+    def observations(self) -> ObservationView:
+        return ObservationView(self, self.first, self.added)
+
+    def get(self, sequence: int) -> Observation:
+        return self._observations[sequence % self.capacity]
+
+    def add(self, text: str | None = None, event: BaseEvent | None = None) -> None:
+        """Add a observation to this log. Without `text` the observation is described by its event."""
+        if text is None and event is None:
+            raise ValueError("An observation needs a text or an event.")
+        observation = Observation(text, event)
+        if self.added and observation.tick < self._ticks[(self.added - 1) % self.capacity]:
+            raise ValueError("Observations must be added in tick order.")
+        store = Engine.instance().observation_store
+        if self.coalesce:
+            merged = self._coalesce(observation)
+            if merged is not None:
+                if store is not None:
+                    store.update(self.parent.id, merged)
+                return
+            self._latest[self._kind(observation)] = self.added
+        if store is not None:
+            store.append(self.parent.id, observation)
+
+        slot = self.added % self.capacity
+        if slot == len(self._observations):
+            self._observations.append(observation)
+            self._ticks.append(observation.tick)
+        else:
+            self._observations[slot] = observation
+            self._ticks[slot] = observation.tick
+        self.index.add(self.added, observation.event)
+        self.added += 1
+        if self.added % self.capacity == 0:
+            self.index.prune(self.first)
+            self._latest = {kind: sequence for kind, sequence in self._latest.items() if sequence >= self.first}
+
+        log.debug("Observation added: {0.text}", observation)
+
+    @staticmethod
+    def _kind(observation: Observation) -> tuple[str | None, type[BaseEvent] | None]:
+        return observation.message, None if observation.event is None else type(observation.event)
+
+    def _coalesce(self, observation: Observation) -> Observation | None:
+        """Try to merge the observation into the latest entry of its kind, and return that entry if it merged."""
+        sequence = self._latest.get(self._kind(observation))
+        if sequence is None or sequence < self.first:
+            return None
+        entry = self.get(sequence)
+        if entry.end_tick >= observation.tick - 1 and entry.merge(observation):
+            return entry
+        return None
+
+    def _bisect(self, tick: int) -> int:
+        """Return the sequence number of the first observation at or after the tick."""
+        low, high = self.first, self.added
+        while low < high:
+            middle = (low + high) // 2
+            if self._ticks[middle % self.capacity] < tick:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, from_tick: int, to_tick: int) -> ObservationView:
+        """Return a view of the observations made from `from_tick` to `to_tick` inclusive."""
+        return ObservationView(self, self._bisect(from_tick), self._bisect(to_tick + 1))
+
+    def find(
+        self,
+        event_type: type[BaseEvent] | None = None,
+        entity: Entity | int | None = None,
+        near: tuple[int, int] | None = None,
+        radius: int = 0,
+        from_tick: int | None = None,
+        to_tick: int | None = None,
+    ) -> list[Observation]:
+        """Return observations matching all given criteria, oldest first.
+
+        Criteria are an event type including its subclasses, an entity involved in the event, the event happening
+        within Chebyshev `radius` of `near`, and a tick window. Candidates come from the indexes, not a log scan.
+        """
+        low = self.first if from_tick is None else self._bisect(from_tick)
+        high = self.added if to_tick is None else self._bisect(to_tick + 1)
+        entity_id = entity if entity is None or isinstance(entity, int) else entity.id
+        sequences = self.index.find(low, high, event_type, entity_id, near, radius)
+        observations = [self.get(sequence) for sequence in (range(low, high) if sequences is None else sequences)]
+        if near is not None:
+            x, y = near
+            observations = [
+                observation
+                for observation in observations
+                if max(abs(observation.event.x - x), abs(observation.event.y - y)) <= radius  # type: ignore[union-attr]
+            ]
+        return observations
+
+    def update(self) -> None:
+        return super().update()
+
+    def __str__(self) -> str:
+        """Represent the log as text suitable for LLMs.
+
+        It is supposed to be overloaded by agents.
+        """
+        return str(list(self.observations))
+
+    def make_embeddings(self) -> None:
+        """Embed the observations added since the last call.
+
+        Batched instead of on-the-fly generation for efficiency.
+        """
+        sequences = range(max(self._embedded, self.first), self.added)
+        self._embedded = self.added
+        if not sequences:
+            return
+
+        embeddings = self.embedder([self.get(sequence).text for sequence in sequences])
+        if self._embeddings is None or len(self._embeddings) < len(self._observations):
+            # Grow with the ring, the rows of slots which are in use are kept.
+            grown = np.zeros((min(self.capacity, 2 * len(self._observations)), embeddings.shape[1]), dtype=np.float32)
+            if self._embeddings is not None:
+                grown[: len(self._embeddings)] = self._embeddings
+            self._embeddings = grown
+        self._embeddings[[sequence % self.capacity for sequence in sequences]] = embeddings
+
+    def query(self, text: str, k: int = 1) -> list[Observation]:
+        """Return up to `k` observations in the log most similar to the text, the most similar first."""
+        self.make_embeddings()
+        if self._embeddings is None:
+            return []
+        scores = self._embeddings[: len(self._observations)] @ self.embedder([text])[0]
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self._observations[slot] for slot in best]
 
     # @staticmethod
     # def wrap(string: str, width: int) -> Iterable[str]:
@@ -119,13 +360,24 @@ class ObservationLog(BaseComponent):
     #             expand_tabs=True,
     #         )
 
-    def report(self, from_time: datetime, to_time: datetime | None = None) -> str:
-        """Return the observations in the log as a string."""
-        if to_time is None:
-            to_time = Engine.instance().time
-        filtered_observations: list[Observation] = []
-        for observation in self.observations:
-            if observation.gametime >= from_time and observation.gametime <= to_time:
-                filtered_observations.append(observation)
+    def report(self, from_time: datetime, to_time: datetime | None = None) -> ObservationReport:
+        """Return the observations made in the time window. `str` of the result renders them as text.
 
-        return "\n".join(map(str, filtered_observations))
\ No newline at end of file
+        If the window reaches back past the oldest observation in the log, and the engine has an observation store,
+        the evicted entries are read from the store. They are stored as the log kept them, so the report is the
+        same as if the log had never evicted them.
+        """
+        engine = Engine.instance()
+        from_tick = Engine.time_to_tick(from_time)
+        if Engine.tick_to_time(from_tick) < from_time:
+            from_tick += 1
+        to_tick = engine.ticks if to_time is None else Engine.time_to_tick(to_time)
+
+        live = self.between(from_tick, to_tick)
+        evicted = self.first > 0 and self._ticks[self.first % self.capacity] >= from_tick
+        if evicted and engine.observation_store is not None:
+            stored = engine.observation_store.between(
+                from_tick, to_tick, actor_id=self.parent.id, before_id=self.get(self.first).id
+            )
+            return ObservationReport(stored, live)
+        return ObservationReport((), live)
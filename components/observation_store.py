@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, overload
+import importlib
+import os
+
+from numpy.typing import NDArray
+import numpy as np
+
+from components.observation_log import Observation
+
+if TYPE_CHECKING:
+    from events.base_event import BaseEvent
+
+# One file per column with one row per entry of an ObservationLog. Text lives in the string heap at
+# [offset, offset + length), within `reserved` bytes so that merged entries can rewrite it in place.
+COLUMNS: dict[str, np.dtype[Any]] = {
+    "tick": np.dtype("<i8"),
+    "last_tick": np.dtype("<i8"),
+    "count": np.dtype("<u4"),
+    "actor": np.dtype("<i8"),
+    "id": np.dtype("<i8"),
+    "event_type": np.dtype("<u2"),
+    "offset": np.dtype("<u8"),
+    "length": np.dtype("<u4"),
+    "reserved": np.dtype("<u4"),
+}
+# Columns which change when observations are merged into an entry.
+MERGED_COLUMNS = ("last_tick", "count", "offset", "length", "reserved")
+
+# Room left after the text of merged entries, so later merges can lengthen their counts without moving it.
+TEXT_SLACK = 16
+
+# Event type of observations which are not about an event.
+NO_EVENT = 0
+
+
+def qualified_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve(name: str) -> type | None:
+    """Return the class with the qualified name, or None if it no longer exists."""
+    module_name, _, qualname = name.partition(":")
+    try:
+        target: Any = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            target = getattr(target, part)
+    except (ImportError, AttributeError):
+        return None
+    return target if isinstance(target, type) else None
+
+
+@dataclass(slots=True)
+class StoredObservation(Observation):
+    """Observation read back from an ObservationStore.
+
+    Its text is the one rendered when it was stored and its event is only known by type.
+    """
+
+    stored_text: str = ""
+    event_type: type[BaseEvent] | None = None
+
+    @property
+    def text(self) -> str:
+        return self.stored_text
+
+
+class StoredObservations(Sequence[StoredObservation]):
+    """Lazy view of rows of an ObservationStore. Text is read from disk only when an observation is accessed."""
+
+    def __init__(self, store: ObservationStore, rows: NDArray[np.intp]) -> None:
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @overload
+    def __getitem__(self, index: int) -> StoredObservation: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> StoredObservations: ...
+
+    def __getitem__(self, index: int | slice) -> StoredObservation | StoredObservations:
+        if isinstance(index, slice):
+            return StoredObservations(self.store, self.rows[index])
+        return self.store.get(int(self.rows[index]))
+
+    def __iter__(self) -> Iterator[StoredObservation]:
+        for row in self.rows:
+            yield self.store.get(int(row))
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self))
+
+
+class ObservationStore:
+    """Entries of the observation logs of every actor of a world in append-only files on disk.
+
+    Each column of COLUMNS is kept in its own file `<path>.<column>`, texts in the `<path>.strings` heap and
+    qualified names of event types in `<path>.types`. Entries are buffered and written once per tick by `flush`,
+    reads go through memory maps of only the columns they need, so the whole history is queryable without loading
+    it into memory. Rows are written in tick order, so tick ranges are found by binary search on the tick column.
+
+    Entries are stored as the logs keep them, coalesced ones included. Entries may still have observations merged
+    into them after they were written, see `update`, so their rows are rewritten when that happens. Their text is
+    overwritten in place if it fits the bytes reserved for it and moved to the end of the heap with some room to
+    grow otherwise, so the heap does not grow with every merge.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = os.fspath(path)
+        self._strings_path = f"{self.path}.strings"
+        self._types_path = f"{self.path}.types"
+
+        self.event_types: list[str] = ["", *self._read_types()]
+        self._event_codes = {name: code for code, name in enumerate(self.event_types)}
+        # Classes of the event types, resolved on first use.
+        self._classes: dict[int, type | None] = {}
+        self._string_size = os.path.getsize(self._strings_path) if os.path.exists(self._strings_path) else 0
+        tick_path = self._column_path("tick")
+        self._row_count = os.path.getsize(tick_path) // COLUMNS["tick"].itemsize if os.path.exists(tick_path) else 0
+        # Entries added since the last flush as (actor, entry).
+        self._pending: list[tuple[int, Observation]] = []
+        # Entries merged into after their rows were written, by row, as (actor, entry).
+        self._updated: dict[int, tuple[int, Observation]] = {}
+        self._columns: dict[str, np.memmap[Any, np.dtype[Any]]] = {}
+        self._strings: np.memmap[Any, np.dtype[np.uint8]] | None = None
+
+    def _column_path(self, name: str) -> str:
+        return f"{self.path}.{name}"
+
+    def _read_types(self) -> list[str]:
+        if not os.path.exists(self._types_path):
+            return []
+        with open(self._types_path, encoding="utf-8") as file:
+            return file.read().splitlines()
+
+    def _event_code(self, event: BaseEvent | None) -> int:
+        if event is None:
+            return NO_EVENT
+        name = qualified_name(type(event))
+        code = self._event_codes.get(name)
+        if code is None:
+            code = self._event_codes[name] = len(self.event_types)
+            self.event_types.append(name)
+            self._classes[code] = type(event)
+            with open(self._types_path, "a", encoding="utf-8") as file:
+                file.write(f"{name}\n")
+        return code
+
+    def event_class(self, code: int) -> type[BaseEvent] | None:
+        if code not in self._classes:
+            self._classes[code] = resolve(self.event_types[code]) if code != NO_EVENT else None
+        return self._classes[code]
+
+    def append(self, actor_id: int, entry: Observation) -> None:
+        """Queue a new entry of the log of the actor. It is written by the next flush."""
+        self._pending.append((actor_id, entry))
+
+    def update(self, actor_id: int, entry: Observation) -> None:
+        """Note that observations were merged into a stored entry, so its row is rewritten by the next flush."""
+        if self._pending and entry.id >= self._pending[0][1].id:
+            return  # Pending entries are written as they are at the flush.
+        # Ids grow in the order entries are appended, so rows are sorted by id.
+        ids = self.column("id")
+        row = int(np.searchsorted(ids, entry.id))
+        # Entries made before the store was attached are not stored.
+        if row < len(ids) and ids[row] == entry.id:
+            self._updated[row] = (actor_id, entry)
+
+    def flush(self) -> None:
+        """Write queued and updated entries to disk in one batch."""
+        if not self._pending and not self._updated:
+            return
+        heap: list[bytes] = []
+        offset = self._string_size
+
+        def place(text: bytes, reserved: int) -> tuple[int, int]:
+            """Append the text to the heap with room for `reserved` bytes and return where it went."""
+            nonlocal offset
+            start = offset
+            heap.append(text.ljust(reserved, b"\0"))
+            offset += reserved
+            return start, reserved
+
+        # Rewritten rows keep their text where it is if it still fits.
+        rows = np.fromiter(self._updated, dtype=np.intp, count=len(self._updated))
+        updates: dict[str, list[int]] = {name: [] for name in MERGED_COLUMNS}
+        in_place: list[tuple[int, bytes]] = []
+        offsets, reserveds = self.column("offset")[rows], self.column("reserved")[rows]
+        for index, (_, entry) in enumerate(self._updated.values()):
+            text = entry.text.encode()
+            start, reserved = int(offsets[index]), int(reserveds[index])
+            if len(text) <= reserved:
+                in_place.append((start, text))
+            else:
+                start, reserved = place(text, len(text) + TEXT_SLACK)
+            for name, value in zip(MERGED_COLUMNS, (entry.end_tick, entry.count, start, len(text), reserved)):
+                updates[name].append(value)
+
+        appended: dict[str, list[int]] = {name: [] for name in COLUMNS}
+        for actor_id, entry in self._pending:
+            text = entry.text.encode()
+            # Merged entries are likely to be merged into again.
+            start, reserved = place(text, len(text) + (TEXT_SLACK if entry.count > 1 else 0))
+            values = (
+                entry.tick,
+                entry.end_tick,
+                entry.count,
+                actor_id,
+                entry.id,
+                self._event_code(entry.event),
+                start,
+                len(text),
+                reserved,
+            )
+            for name, value in zip(COLUMNS, values):
+                appended[name].append(value)
+
+        if in_place:
+            with open(self._strings_path, "r+b") as strings:
+                for start, text in in_place:
+                    strings.seek(start)
+                    strings.write(text)
+        if heap:
+            with open(self._strings_path, "ab") as file:
+                file.write(b"".join(heap))
+        if len(rows):
+            for name, merged in updates.items():
+                dtype = COLUMNS[name]
+                with open(self._column_path(name), "r+b") as column:
+                    for row, value in zip(rows.tolist(), np.asarray(merged, dtype=dtype)):
+                        column.seek(row * dtype.itemsize)
+                        column.write(value.tobytes())
+        # Maps see rows rewritten in place, they are recreated on the next read only if their file grew.
+        if self._pending:
+            for name, new in appended.items():
+                with open(self._column_path(name), "ab") as file:
+                    np.asarray(new, dtype=COLUMNS[name]).tofile(file)
+            self._columns.clear()
+        if heap:
+            self._strings = None
+        self._string_size = offset
+        self._row_count += len(self._pending)
+        self._pending.clear()
+        self._updated.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._columns.clear()
+        self._strings = None
+
+    def column(self, name: str) -> NDArray[Any]:
+        """Memory-mapped column of all flushed entries."""
+        column = self._columns.get(name)
+        if column is None:
+            if self._row_count == 0:
+                return np.empty(0, dtype=COLUMNS[name])
+            column = self._columns[name] = np.memmap(self._column_path(name), dtype=COLUMNS[name], mode="r")
+        return column
+
+    def __len__(self) -> int:
+        return self._row_count + len(self._pending)
+
+    def get(self, row: int) -> StoredObservation:
+        """Read one entry back."""
+        if self._strings is None:
+            self._strings = np.memmap(self._strings_path, dtype=np.uint8, mode="r")
+        start = int(self.column("offset")[row])
+        count, last_tick = int(self.column("count")[row]), int(self.column("last_tick")[row])
+        return StoredObservation(
+            tick=int(self.column("tick")[row]),
+            id=int(self.column("id")[row]),
+            count=count,
+            last_tick=last_tick if count > 1 else None,
+            stored_text=self._strings[start : start + int(self.column("length")[row])].tobytes().decode(),
+            event_type=self.event_class(int(self.column("event_type")[row])),
+        )
+
+    def between(
+        self,
+        from_tick: int,
+        to_tick: int,
+        actor_id: int | None = None,
+        event_type: type[BaseEvent] | None = None,
+        before_id: int | None = None,
+    ) -> StoredObservations:
+        """Return entries made from `from_tick` to `to_tick` inclusive.
+
+        Optionally only entries of one actor, of an event type including its subclasses, or with ids below
+        `before_id`.
+        """
+        self.flush()
+        ticks = self.column("tick")
+        start = int(np.searchsorted(ticks, from_tick, side="left"))
+        stop = int(np.searchsorted(ticks, to_tick, side="right"))
+        selected = np.arange(start, stop)
+        if actor_id is not None or event_type is not None or before_id is not None:
+            mask = np.ones(stop - start, dtype=np.bool_)
+            if actor_id is not None:
+                mask &= self.column("actor")[start:stop] == actor_id
+            if event_type is not None:
+                codes = [
+                    code
+                    for code in range(1, len(self.event_types))
+                    if (cls := self.event_class(code)) is not None and issubclass(cls, event_type)
+                ]
+                mask &= np.isin(self.column("event_type")[start:stop], codes)
+            if before_id is not None:
+                mask &= self.column("id")[start:stop] < before_id
+            selected = selected[mask]
+        return StoredObservations(self, selected)
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
+import time
 
+from components.needs import update_needs
 from events.map_events import BaseMapEvent
 
 if TYPE_CHECKING:
+    from components.observation_store import ObservationStore
     from game_map.game_map import GameMap
     from tcod import Console
 
-from loguru import logger
+from logs import configure_logging, get_logger, is_configured
+
+log = get_logger("engine")
 
 # TODO overhaul rendering system. There should be some tree of renderable objects.
 # def render_bar(console: Console, current_value: int, maximum_value: int, total_width: int) -> None:
@@ -31,6 +36,11 @@ from loguru import logger
 #     console.print(x=x, y=y, string=names_at_mouse_location)
 
 
+# Game time at tick 0 and how much game time passes every tick.
+START_TIME = datetime(1, 1, 1)
+TICK_DURATION = timedelta(seconds=15)
+
+
 class Engine:
     _instance: Engine | None = None
 
@@ -38,22 +48,37 @@ class Engine:
     game_map: GameMap
     ticks: int
     map_events: list[BaseMapEvent]
+    # Keeps the full history of observations of all actors on disk if set.
+    observation_store: ObservationStore | None
+    # Seconds spent in every phase of `tick` over all ticks so far.
+    phase_times: dict[str, float]
 
     def __new__(cls, game_map: GameMap):
         if cls._instance is None:
-            logger.remove()
-            logger.add("log.txt", level="INFO", rotation="1 week")
-            print("Creating the Engine")
+            if not is_configured():
+                configure_logging()
+            log.info("Creating the Engine")
             cls._instance = super().__new__(cls)
             cls._instance.mouse_location = (0, 0)
             cls._instance.game_map = game_map
             cls._instance.ticks = 0
             cls._instance.map_events = []
+            cls._instance.observation_store = None
+            cls._instance.phase_times = dict.fromkeys(PHASES, 0.0)
         return cls._instance
 
     @property
     def time(self) -> datetime:
-        return datetime(1, 1, 1) + timedelta(seconds=self.ticks * 15)
+        return self.tick_to_time(self.ticks)
+
+    @staticmethod
+    def tick_to_time(tick: int) -> datetime:
+        return START_TIME + tick * TICK_DURATION
+
+    @staticmethod
+    def time_to_tick(time: datetime) -> int:
+        """Return the last tick which starts at or before the given game time."""
+        return (time - START_TIME) // TICK_DURATION
 
     @classmethod
     def instance(cls, game_map: GameMap | None = None):
@@ -63,25 +88,52 @@ class Engine:
             cls._instance = cls(game_map)
         return cls._instance
 
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the instance, so another world can be created in the same process."""
+        cls._instance = None
+
     def render(self, console: Console) -> None:
         self.game_map.render(console)
 
     def tick(self) -> None:
+        phase_times = self.phase_times
+        start = time.perf_counter()
+
         for interactable in self.game_map.interactables:
             interactable.update()
         
         for actor in self.game_map.actors:
             actor.update()
+        if self.game_map.actor_store is not None:
+            update_needs(self.game_map.actor_store)
+        start = _lap(phase_times, "update", start)
 
-        for event in self.map_events:
-            self.game_map.handle_event(event)
-
+        self.game_map.handle_events(self.map_events)
         self.map_events = []
+        start = _lap(phase_times, "events", start)
 
         self.ticks += 1
         self.game_map.update_fov()
+        start = _lap(phase_times, "fov", start)
 
         for actor in self.game_map.actors:
             actor.ai.update()
             if actor.ai.harness is not None:
                 actor.ai.harness.get_next_action().perform()
+        start = _lap(phase_times, "ai", start)
+
+        if self.observation_store is not None:
+            self.observation_store.flush()
+        _lap(phase_times, "store", start)
+
+
+# Phases of Engine.tick in the order they run.
+PHASES = ("update", "events", "fov", "ai", "store")
+
+
+def _lap(phase_times: dict[str, float], phase: str, start: float) -> float:
+    """Add the time since `start` to the phase and return the current time."""
+    now = time.perf_counter()
+    phase_times[phase] += now - start
+    return now
@@ -9,15 +9,19 @@ from components.consumable import Consumable
 from components.inventory import Inventory
 from components.needs import Needs
 from components.observation_log import ObservationLog
-from events.internal_events import BaseInternalEvent, ConsumeEvent, HealthLossEvent, TickEvent
+from events.internal_events import HEALTH_LOSS_1, TICK, BaseInternalEvent, ConsumeEvent, HealthLossEvent, TickEvent
 from events.map_events import AttackEvent, BaseMapEvent, DropEvent, PickupEvent, SpawnEvent, UseEvent
 from game_map.render_order import RenderOrder
 
 if TYPE_CHECKING:
     from components.ai import BaseAI
+    from game_map.actor_store import ActorStore
+    from game_map.game_map import GameMap
 
 
 class Entity(ABC):
+    __slots__ = ("name", "char", "x", "y", "color", "render_order", "blocks_movement", "id", "game_map")
+
     _next_id = 1
 
     def __init__(
@@ -39,13 +43,17 @@ class Entity(ABC):
         self.blocks_movement = blocks_movement
         self.id = Entity._next_id
         Entity._next_id += 1
+        self.game_map: GameMap | None = None  # Set by GameMap when the entity is spawned.
 
     def __hash__(self):
         return hash(self.id)
 
     def move(self, dx: int, dy: int) -> None:
+        old_x, old_y = self.x, self.y
         self.x += dx
         self.y += dy
+        if self.game_map is not None:
+            self.game_map.entity_moved(self, old_x, old_y)
 
     @abstractmethod
     def update(self):
@@ -53,6 +61,11 @@ class Entity(ABC):
 
 
 class Actor(Entity):
+    __slots__ = ("ai", "needs", "inventory", "observation_log", "eyesight", "actor_store", "actor_slot")
+
+    # Attributes holding components, which are updated every tick. Subclasses with more components extend it.
+    component_slots: tuple[str, ...] = ("ai", "needs", "inventory", "observation_log")
+
     def __init__(
         self,
         name: str,
@@ -66,6 +79,8 @@ class Actor(Entity):
         observation_log: ObservationLog,
         eyesight: int = 8,
     ):
+        self.actor_store: ActorStore | None = None
+        self.actor_slot = -1
         super().__init__(name, char, x, y, color, RenderOrder.ACTOR, True)
         self.ai = ai_fun(self)
         self.needs = needs
@@ -75,41 +90,33 @@ class Actor(Entity):
 
     def handle_internal_event(self, event: BaseInternalEvent):
         match event:
-            case HealthLossEvent(amount):
-                observation = f"You have lost {amount} hp"
-            case ConsumeEvent(consumable):
-                observation = f"You consumed {consumable.name}"
+            case HealthLossEvent() | ConsumeEvent():
+                self.observation_log.add(event=event)
             case TickEvent():
-                self.ai.handle_event(event)
-                return
+                pass
             case _:
                 raise NotImplementedError(f"Unhandled event {event}")
 
-        self.observation_log.add(observation, event)
         self.ai.handle_event(event)
 
     def handle_external_event(self, event: BaseMapEvent) -> None:
         match event:
-            case SpawnEvent(x, y, entity):
-                observation = f"{entity.name} appeared at [{x}, {y}]"
-            case AttackEvent(x, y, actor, target):
-                observation = f"{actor.name} attacked {target.name} at [{x}, {y}]"
-            case PickupEvent(x, y, actor, item):
-                observation = f"{actor.name} picked up {item.name} at [{x}, {y}]"
-            case DropEvent(x, y, actor, item):
-                observation = f"{actor.name} dropped {item.name} at [{x}, {y}]"
-            case UseEvent(x, y, actor, item):
-                observation = f"{actor.name} used {item.name} at [{x}, {y}]"
+            case SpawnEvent() | AttackEvent() | PickupEvent() | DropEvent() | UseEvent():
+                # The text is rendered by the event when needed, see BaseEvent.describe.
+                self.observation_log.add(event=event)
             case _:
                 raise NotImplementedError(f"Unhandled event {event}")
 
-        self.observation_log.add(observation, event)
-
     def update(self):
-        self.handle_internal_event(HealthLossEvent(1))  # TODO example
-        self.handle_internal_event(TickEvent())
+        self.handle_internal_event(HEALTH_LOSS_1)  # TODO example
+        self.handle_internal_event(TICK)
 
-        for component in self.__dict__.values():
+        for name in self.component_slots:
+            component = getattr(self, name, None)
+            if isinstance(component, BaseComponent):
+                component.update()
+        # Subclasses without slots may also keep components in their __dict__.
+        for component in getattr(self, "__dict__", {}).values():
             if isinstance(component, BaseComponent):
                 component.update()
         return super().update()
@@ -127,6 +134,8 @@ class Interactable(Entity, ABC):
     """Entity which is not alive and can be interacted with
     Blocks movement
     """
+    __slots__ = ()
+
     # TODO think about how it should be in game
     def __init__(
         self,
@@ -144,6 +153,8 @@ class Interactable(Entity, ABC):
 
 
 class Item(Entity, ABC):
+    __slots__ = ("consumable",)
+
     def __init__(
         self,
         name: str,
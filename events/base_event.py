@@ -1,5 +1,43 @@
+from __future__ import annotations
+
 from abc import ABC
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Entity
 
 
 class BaseEvent(ABC):
-    pass
+    __slots__ = ("_description",)
+    _description: str
+
+    def describe(self) -> str:
+        """Return the text of observations of this event.
+
+        It is rendered on first use and then shared by every actor who observed the event.
+        """
+        try:
+            return self._description
+        except AttributeError:
+            description = self.render_description()
+            # Events may be frozen dataclasses.
+            object.__setattr__(self, "_description", description)
+            return description
+
+    def render_description(self) -> str:
+        raise NotImplementedError(f"{type(self).__name__} can not be observed")
+
+    def entities(self) -> tuple[Entity, ...]:
+        """Return the entities involved in the event."""
+        return ()
+
+    def merge(self, other: BaseEvent) -> BaseEvent | None:
+        """Return one event standing for this event followed by `other`, or None if they can not be merged.
+
+        By default only equal events are merged, as repeats of the same event.
+        """
+        return self if self == other else None
+
+    def describe_repeated(self, count: int, ticks: int) -> str:
+        """Return the text of `count` observations of this event merged over `ticks` ticks."""
+        return f"{self.describe()} ({count} times over {ticks} ticks)"
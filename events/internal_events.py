@@ -10,24 +10,48 @@ if TYPE_CHECKING:
   from components.consumable import Consumable
   from entity import Item
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BaseInternalEvent(BaseEvent, ABC):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TickEvent(BaseInternalEvent):
     pass
 
 
-@dataclass
+# Tick events carry no data, so every actor shares this one every tick.
+TICK = TickEvent()
+
+
+@dataclass(frozen=True, slots=True)
 class HealthLossEvent(BaseInternalEvent):
     amount: int
 
-@dataclass
+    def render_description(self) -> str:
+        return f"You have lost {self.amount} hp"
+
+    def merge(self, other: BaseEvent) -> BaseEvent | None:
+        if isinstance(other, HealthLossEvent):
+            return HealthLossEvent(self.amount + other.amount)
+        return None
+
+    def describe_repeated(self, count: int, ticks: int) -> str:
+        # The amount is already the total.
+        return f"{self.describe()} over {ticks} ticks"
+
+
+# Events are immutable, so actors losing 1 hp every tick share this one instead of creating their own.
+HEALTH_LOSS_1 = HealthLossEvent(1)
+
+
+@dataclass(frozen=True, slots=True)
 class HealEvent(BaseInternalEvent):
     amount: int
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ConsumeEvent(BaseInternalEvent):
-    consumable: Consumable
\ No newline at end of file
+    consumable: Consumable
+
+    def render_description(self) -> str:
+        return f"You consumed {self.consumable.name}"
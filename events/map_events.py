@@ -9,40 +9,73 @@ from events.base_event import BaseEvent
 if TYPE_CHECKING:
     from entity import Actor, Entity, Item
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BaseMapEvent(BaseEvent, ABC):
     x: int
     y: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActorEvent(BaseMapEvent, ABC):
     actor: Actor
 
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.actor,)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class SpawnEvent(BaseMapEvent):
     entity: Entity
 
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.entity,)
+
+    def render_description(self) -> str:
+        return f"{self.entity.name} appeared at [{self.x}, {self.y}]"
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttackEvent(ActorEvent):
     target: Actor
 
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.actor, self.target)
 
-@dataclass
+    def render_description(self) -> str:
+        return f"{self.actor.name} attacked {self.target.name} at [{self.x}, {self.y}]"
+
+
+@dataclass(frozen=True, slots=True)
 class PickupEvent(ActorEvent):
     item: Item
 
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.actor, self.item)
+
+    def render_description(self) -> str:
+        return f"{self.actor.name} picked up {self.item.name} at [{self.x}, {self.y}]"
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class DropEvent(ActorEvent):
     item: Item
 
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.actor, self.item)
+
+    def render_description(self) -> str:
+        return f"{self.actor.name} dropped {self.item.name} at [{self.x}, {self.y}]"
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UseEvent(ActorEvent):
     item: Actor
+
+    def entities(self) -> tuple[Entity, ...]:
+        return (self.actor, self.item)
+
+    def render_description(self) -> str:
+        return f"{self.actor.name} used {self.item.name} at [{self.x}, {self.y}]"
 # @dataclass
 # class MoveEvent(ActorEvent):
 #     dx: int
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 
 from events.base_event import BaseEvent
 from events.internal_events import HealthLossEvent, TickEvent
+from logs import get_logger
+
+log = get_logger("triggers")
 
 
 class StopTrigger(ABC):
@@ -41,7 +44,7 @@ class TickTrigger(StopTrigger):
             return False
         self.ticks += 1
 
-        print(f"Handle tick: {self.ticks}/{self.amount_to_act}")
+        log.debug("Handle tick: {}/{}", self.ticks, self.amount_to_act)
         return self.ticks >= self.amount_to_act
 
     def report(self) -> str:
@@ -1,4 +1,6 @@
-from components.ai import HarnessFactory, ManualInputAI, SingleHarnessAI
+from collections.abc import Callable
+
+from components.ai import BaseAI, HarnessFactory, ManualInputAI, SingleHarnessAI
 from components.consumable import HealingConsumable
 from components.inventory import Inventory
 from components.needs import Needs
@@ -28,27 +30,35 @@ def manual_input_ai(actor: Actor):
     )
 
 
-def spawn_human(game_map: GameMap, x: int, y: int) -> Actor:
-    human = Actor(
+def create_human(
+    x: int, y: int, ai_fun: Callable[[Actor], BaseAI] = manual_input_ai, coalesce: bool = False
+) -> Actor:
+    return Actor(
         inventory=Inventory(10),
         needs=Needs(max_hp=1000, max_hunger=1000, max_thirst=1000, max_sleepiness=1000, max_lonliness=1000),
-        observation_log=ObservationLog(512),
-        ai_fun=manual_input_ai,
+        observation_log=ObservationLog(512, coalesce=coalesce),
+        ai_fun=ai_fun,
         name="human",
         char="@",
         x=x,
         y=y,
         color=(0, 0, 0),
     )
+
+
+def spawn_human(
+    game_map: GameMap, x: int, y: int, ai_fun: Callable[[Actor], BaseAI] = manual_input_ai, coalesce: bool = False
+) -> Actor:
+    human = create_human(x, y, ai_fun, coalesce)
     game_map.spawn_actor(human)
     return human
 
 
-def spawn_orc(game_map: GameMap, x: int, y: int) -> Actor:
-    orc = Actor(
+def create_orc(x: int, y: int, coalesce: bool = False) -> Actor:
+    return Actor(
         inventory=Inventory(),
         needs=Needs(max_hp=1000, max_hunger=1000, max_thirst=1000, max_sleepiness=1000, max_lonliness=1000),
-        observation_log=ObservationLog(256),
+        observation_log=ObservationLog(256, coalesce=coalesce),
         ai_fun=do_nothing_ai,
         name="orc",
         x=x,
@@ -56,12 +66,16 @@ def spawn_orc(game_map: GameMap, x: int, y: int) -> Actor:
         char="o",
         color=(63, 127, 63),
     )
+
+
+def spawn_orc(game_map: GameMap, x: int, y: int) -> Actor:
+    orc = create_orc(x, y)
     game_map.spawn_actor(orc)
     return orc
 
 
-def spawn_health_potion(game_map: GameMap, x: int, y: int):
-    health_potion = Item(
+def create_health_potion(x: int, y: int) -> Item:
+    return Item(
         name="health potion",
         x=x,
         y=y,
@@ -69,5 +83,9 @@ def spawn_health_potion(game_map: GameMap, x: int, y: int):
         color=(255, 0, 0),
         consumable=HealingConsumable(name="Health Potion", amount=4),
     )
+
+
+def spawn_health_potion(game_map: GameMap, x: int, y: int) -> Item:
+    health_potion = create_health_potion(x, y)
     game_map.spawn_item(health_potion)
     return health_potion
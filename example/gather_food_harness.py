@@ -1,47 +1,67 @@
-
 from __future__ import annotations
 from actions import InteractAction, MovementAction, PickupAction, WaitAction
 from components.consumable import Food
+from entity import Item
 from events.trigger import TickTrigger
 from harnesses.action_in_area_harness import ActionInAreaHarness
 from typing import TYPE_CHECKING
-from engine import Engine
+from logs import get_logger
 
 if TYPE_CHECKING:
     from actions import Action
     from entity import Actor, Interactable
 
+log = get_logger("harnesses")
+
 class GatherFoodHarness(ActionInAreaHarness):
+    """Pick up food the actor knows of in the area, and shake the interactables of the area in turn for more."""
+
     def __init__(self, actor: Actor, radius: int):
         super().__init__(actor, radius, stop_triggers=[TickTrigger(5)])
         self.pointer = 0
-        self.interactable: Interactable | None = None 
+        self.interactable: Interactable | None = None
         self.next_interactable()
 
-
     def get_next_action(self) -> Action:
-        game_map = Engine.instance().game_map
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                x = self.actor.x + dx
-                y = self.actor.y + dy
-                item = game_map.get_item_at_location(x, y)
-                if item and isinstance(item.consumable, Food) and not self.actor.inventory.is_full():
-                    return PickupAction(self.actor, item)
-                
+        game_map = self.game_map
+        if not self.actor.inventory.is_full():
+            food = game_map.nearest(
+                self.actor.x,
+                self.actor.y,
+                1,
+                Item,
+                predicate=lambda item: isinstance(item.consumable, Food) and self.in_area(item),
+                # The actor stays in the area, so everything in it is within twice the radius.
+                radius=2 * self.radius,
+                mask=game_map.fovs[self.actor].explored,
+            )
+            if food:
+                if game_map.chebyshev_distance((self.actor.x, self.actor.y), (food[0].x, food[0].y)) <= 2:
+                    return PickupAction(self.actor, food[0])
+                action = self.walk_to(food[0].x, food[0].y)
+                if action is not None:
+                    return action
+
         if not self.interactable:
-            print("No interactables around, just wait")
+            log.debug("No interactables around, just wait")
             return WaitAction(self.actor)
-        path = self.get_path_to(self.interactable.x, self.interactable.y)
-        if len(path) > 1:
-            print(f"MovementAction", len(path))
-            return MovementAction(self.actor, path[0][0] - self.actor.x, path[0][1] - self.actor.y)
-        
-        print(f"Interact with {self.interactable}")
+        action = self.walk_to(self.interactable.x, self.interactable.y)
+        if action is not None:
+            return action
+
+        log.debug("Interact with {}", self.interactable)
         action = InteractAction(self.actor, self.interactable)
         self.next_interactable()
         return action
-    
+
+    def walk_to(self, x: int, y: int) -> Action | None:
+        """Return the next step of the path next to (x, y), or None if the actor is there or there is no path."""
+        path = self.get_path_to(x, y)
+        if len(path) <= 1:
+            return None
+        log.debug("MovementAction {}", len(path))
+        return MovementAction(self.actor, path[0][0] - self.actor.x, path[0][1] - self.actor.y)
+
     def next_interactable(self) -> None:
         if len(self.interactables) == 0:
             return None
@@ -49,8 +69,6 @@ class GatherFoodHarness(ActionInAreaHarness):
         self.pointer += 1
         if self.pointer >= len(self.interactables):
             self.pointer = 0
-          
-        
 
     def __str__(self) -> str:
-        return "Gathering food"
\ No newline at end of file
+        return "Gathering food"
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Run the example world without a window, as fast as possible.
+
+Run from the repository root: python -m example.headless --ticks 10000
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import argparse
+import time
+
+from components.ai import BaseAI
+from components.observation_store import ObservationStore
+from engine import Engine
+from entity import Actor
+from example.entity_factories import do_nothing_ai, explore_ai
+from example.populate_island import populate_island
+from game_map.island_generator import IslandSettings, generate_island
+from logs import configure_logging, flush_logs
+
+
+# What the human does without a player choosing harnesses. Gathering food needs the field of view of the human,
+# which does not exist yet when its AI is created, so it is not offered.
+HUMAN_AIS: dict[str, Callable[[Actor], BaseAI]] = {
+    "do-nothing": do_nothing_ai,
+    "explore": explore_ai,
+}
+
+
+@dataclass
+class SimulationReport:
+    ticks: int
+    # Wall-clock seconds spent ticking, without building the world.
+    elapsed: float
+    # Seconds spent in every phase of Engine.tick.
+    phase_times: dict[str, float]
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed else float("inf")
+
+    def __str__(self) -> str:
+        lines = [f"{self.ticks} ticks in {self.elapsed:.3f} s, {self.ticks_per_second:.1f} ticks/s"]
+        for phase, seconds in self.phase_times.items():
+            share = seconds / self.elapsed if self.elapsed else 0.0
+            per_tick = seconds / max(self.ticks, 1) * 1e3
+            lines.append(f"  {phase:<8} {seconds:9.3f} s {share:6.1%} {per_tick:9.3f} ms/tick")
+        return "\n".join(lines)
+
+
+def build_world(
+    width: int = 160,
+    height: int = 100,
+    seed: int = 42,
+    human_ai: Callable[[Actor], BaseAI] = explore_ai,
+    actor_store: bool = False,
+    observation_store: str | None = None,
+    coalesce: bool = False,
+) -> Engine:
+    """Generate and populate an island the same way `example.main` does, with an AI for the human.
+
+    Engine is a singleton, so building a world replaces the one built before.
+    """
+    island = generate_island(width, height, IslandSettings(seed=seed))
+    Engine.reset()
+    engine = Engine.instance(game_map=island)
+    populate_island(island, seed=seed, human_ai=human_ai, coalesce=coalesce)
+    if actor_store:
+        island.enable_actor_store()
+    if observation_store is not None:
+        engine.observation_store = ObservationStore(observation_store)
+    island.update_fov()
+    return engine
+
+
+def simulate(engine: Engine, ticks: int) -> SimulationReport:
+    """Run `ticks` ticks back to back and time them."""
+    phase_times = dict(engine.phase_times)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.tick()
+    elapsed = time.perf_counter() - start
+    return SimulationReport(
+        ticks=ticks,
+        elapsed=elapsed,
+        phase_times={phase: engine.phase_times[phase] - phase_times[phase] for phase in engine.phase_times},
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the island and of its population.")
+    parser.add_argument("--human", choices=HUMAN_AIS, default="explore", help="What the human does.")
+    parser.add_argument("--actor-store", action="store_true", help="Keep actors in the columnar store.")
+    parser.add_argument("--observation-store", metavar="PATH", help="Write all observations to files at PATH.")
+    parser.add_argument("--coalesce", action="store_true", help="Merge repeated observations in the logs.")
+    parser.add_argument("--log", default="log.txt", help="Log file.")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    configure_logging(args.log, level=args.log_level)
+    engine = build_world(
+        width=args.width,
+        height=args.height,
+        seed=args.seed,
+        human_ai=HUMAN_AIS[args.human],
+        actor_store=args.actor_store,
+        observation_store=args.observation_store,
+        coalesce=args.coalesce,
+    )
+    report = simulate(engine, args.ticks)
+    if engine.observation_store is not None:
+        engine.observation_store.close()
+    flush_logs()
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
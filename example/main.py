@@ -46,7 +46,7 @@ def new_game() -> Engine:
 
     island = generate_island(map_width, map_height)
     engine = Engine.instance(game_map=island)
-    populate_island(island)
+    populate_island(island, coalesce=True)
     island.update_fov()
     # player.parent = engine.game_map
     # engine.game_map.entities.add(player)
@@ -1,6 +1,11 @@
-import random
+from collections.abc import Callable
+from functools import partial
 
-from example.entity_factories import spawn_health_potion, spawn_human, spawn_orc
+import numpy as np
+
+from components.ai import BaseAI
+from entity import Actor
+from example.entity_factories import create_health_potion, create_orc, manual_input_ai, spawn_human
 from example.tree import Tree
 from game_map import tile_types
 from game_map.game_map import GameMap
@@ -19,34 +24,29 @@ def populate_island(
     island: GameMap,
     maximum_monsters: int = 10,
     maximum_items: int = 5,
+    tree_density: float = 0.05,
+    seed: int | None = None,
+    human_ai: Callable[[Actor], BaseAI] = manual_input_ai,
+    coalesce: bool = False,
 ):
-    spawn_human(island, island.width // 2, island.height // 2)
-
-    number_of_monsters = random.randint(1, maximum_monsters)
-    number_of_items = random.randint(1, maximum_items)
-
-    while number_of_monsters > 0:
-        x = random.randint(0, island.width - 1)
-        y = random.randint(0, island.height - 1)
-
-        if not any(entity.x == x and entity.y == y for entity in island.entities) and island.tiles[x, y][0]:
-            spawn_orc(island, x, y)
-            number_of_monsters -= 1
-
-    while number_of_items > 0:
-        x = random.randint(0, island.width - 1)
-        y = random.randint(0, island.height - 1)
-
-        if not any(entity.x == x and entity.y == y for entity in island.entities) and island.tiles[x, y][0]:
-            if random.random() < 0.7:
-                spawn_health_potion(island, x, y)
-            number_of_items -= 1
-
-    # TODO it's just tile_type
-    for x in range(island.width):
-        for y in range(island.height):
-            if island.tiles[x, y] == tile_types.forrest:
-                if random.random() < 0.05:
-                    spawn_tree(island, x, y)
+    rng = np.random.default_rng(seed)
+
+    spawn_human(island, island.width // 2, island.height // 2, human_ai, coalesce)
+
+    number_of_monsters = rng.integers(1, maximum_monsters, endpoint=True)
+    number_of_items = rng.integers(1, maximum_items, endpoint=True)
+
+    xs, ys = island.sample_free_cells(number_of_monsters, rng)
+    island.spawn_many(xs, ys, partial(create_orc, coalesce=coalesce))
+
+    xs, ys = island.sample_free_cells(number_of_items, rng)
+    # Some of the item spots stay empty.
+    potions = rng.random(len(xs)) < 0.7
+    island.spawn_many(xs[potions], ys[potions], create_health_potion)
+
+    forrest = island.tiles == tile_types.FORREST
+    trees = forrest & island.free_cells() & (rng.random(forrest.shape) < tree_density)
+    xs, ys = np.nonzero(trees)
+    island.spawn_many(xs, ys, Tree)
 
     return island
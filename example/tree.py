@@ -19,6 +19,8 @@ def spawn_apple(game_map: GameMap, x: int, y: int):
 
 
 class Tree(Interactable):
+    __slots__ = ("max_apples", "apples")
+
     max_apples: int
     apples: int
 
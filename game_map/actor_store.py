@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from numpy.typing import NDArray
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+T = TypeVar("T")
+
+# Columns of the store and their types. Positions and eyesight belong to the actor, the rest to its Needs.
+COLUMNS: dict[str, type[np.integer[Any]]] = {
+    "x": np.int32,
+    "y": np.int32,
+    "eyesight": np.int32,
+    "hp": np.int32,
+    "max_hp": np.int32,
+    "hunger": np.int32,
+    "max_hunger": np.int32,
+    "thirst": np.int32,
+    "max_thirst": np.int32,
+    "sleepiness": np.int32,
+    "max_sleepiness": np.int32,
+    "lonliness": np.int32,
+    "max_lonliness": np.int32,
+    "hunger_rate": np.int32,
+    "thirst_rate": np.int32,
+    "sleepiness_rate": np.int32,
+    "lonliness_rate": np.int32,
+}
+ACTOR_COLUMNS = ("x", "y", "eyesight")
+NEEDS_COLUMNS = tuple(name for name in COLUMNS if name not in ACTOR_COLUMNS)
+
+
+class StoredField(Generic[T]):
+    """Attribute which lives in a column of the ActorStore of its owner.
+
+    Only the classes which `stored_class` creates for attached owners have these fields, detached owners keep
+    plain attributes and pay nothing for the store.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, owner: type | None = None) -> T:
+        if obj is None:
+            raise AttributeError(self.name)
+        return obj.actor_store.columns[self.name][obj.actor_slot].item()  # type: ignore[no-any-return]
+
+    def __set__(self, obj: Any, value: T) -> None:
+        obj.actor_store.columns[self.name][obj.actor_slot] = value
+
+
+_stored_classes: dict[type, type] = {}
+
+
+def stored_class(cls: type, names: Sequence[str]) -> type:
+    """Return the subclass of `cls` whose attributes `names` are StoredFields.
+
+    It adds no instance attributes, so owners switch between the two classes by assigning `__class__`.
+    """
+    stored = _stored_classes.get(cls)
+    if stored is None:
+        namespace: dict[str, Any] = {name: StoredField() for name in names}
+        namespace.update(__slots__=(), __module__=cls.__module__, __qualname__=cls.__qualname__, detached_class=cls)
+        stored = _stored_classes[cls] = type(cls.__name__, (cls,), namespace)
+    return stored
+
+
+def attach(owner: Any, names: Sequence[str], store: ActorStore, slot: int) -> None:
+    for name in names:
+        store.columns[name][slot] = getattr(owner, name)
+    owner.actor_store, owner.actor_slot = store, slot
+    owner.__class__ = stored_class(type(owner), names)
+
+
+def detach(owner: Any, names: Sequence[str]) -> None:
+    values = [getattr(owner, name) for name in names]
+    owner.__class__ = owner.detached_class
+    owner.actor_store, owner.actor_slot = None, -1
+    for name, value in zip(names, values):
+        setattr(owner, name, value)
+
+
+class ActorStore:
+    """State of many actors in NumPy columns indexed by a dense slot.
+
+    Slots are the ones the VisibilityIndex of the map allocates, `actors` is its list of slot owners. Attached
+    actors and their Needs read and write their positions, eyesight, hp and need counters through StoredFields,
+    so code using the objects keeps working while per-tick systems update whole columns at once. Only the first
+    `len(self.actors)` rows are in use, `alive` marks the rows of attached actors.
+    """
+
+    def __init__(self, actors: list[Actor | None], capacity: int = 16) -> None:
+        self.actors = actors
+        self.columns: dict[str, NDArray[np.integer[Any]]] = {
+            name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    def __getattr__(self, name: str) -> NDArray[Any]:
+        """Return the used rows of a column, e.g. `store.hunger`."""
+        columns = self.__dict__.get("columns")
+        if columns is None or name not in columns:
+            raise AttributeError(name)
+        return columns[name][: len(self.actors)]  # type: ignore[no-any-return]
+
+    def reserve(self, capacity: int) -> None:
+        """Make room for at least `capacity` slots, so adding many actors does not grow the columns repeatedly."""
+        if capacity <= len(self.alive):
+            return
+        capacity = max(capacity, 2 * len(self.alive))
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: len(column)] = column
+            self.columns[name] = grown
+        alive = np.zeros(capacity, dtype=np.bool_)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+
+    def add(self, actor: Actor, slot: int) -> None:
+        """Move the state of the actor into its slot."""
+        self.reserve(slot + 1)
+        attach(actor, ACTOR_COLUMNS, self, slot)
+        attach(actor.needs, NEEDS_COLUMNS, self, slot)
+        self.alive[slot] = True
+
+    def add_many(self, actors: Sequence[Actor], slots: Sequence[int]) -> None:
+        """Move the state of the actors into their slots, filling each column at once."""
+        if not actors:
+            return
+        index = np.asarray(slots, dtype=np.intp)
+        self.reserve(int(index.max()) + 1)
+        self._attach_many(actors, ACTOR_COLUMNS, slots)
+        self._attach_many([actor.needs for actor in actors], NEEDS_COLUMNS, slots)
+        self.alive[index] = True
+
+    def _attach_many(self, owners: Sequence[Any], names: Sequence[str], slots: Sequence[int]) -> None:
+        """Like `attach` for many owners, filling each column at once."""
+        for name in names:
+            self.columns[name][slots] = list(map(attrgetter(name), owners))
+        stored = {cls: stored_class(cls, names) for cls in set(map(type, owners))}
+        for slot, owner in zip(slots, owners):
+            owner.actor_store, owner.actor_slot = self, slot
+            owner.__class__ = stored[type(owner)]
+
+    def remove(self, slot: int) -> None:
+        """Copy the state of the actor in the slot back into its objects."""
+        actor = self.actors[slot]
+        assert actor is not None
+        detach(actor, ACTOR_COLUMNS)
+        detach(actor.needs, NEEDS_COLUMNS)
+        self.alive[slot] = False
+
+    def live_slots(self) -> NDArray[np.intp]:
+        return np.flatnonzero(self.alive[: len(self.actors)])
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from numpy.typing import NDArray
+import numpy as np
+import tcod.path
+
+from .fov_cache import grow_window
+
+if TYPE_CHECKING:
+    from .fov_cache import Window
+    from .game_map import Fov, GameMap
+
+# Distance of cells from which no unexplored cell can be reached.
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Cells around newly explored ones which are recomputed first when repairing the map.
+REPAIR_MARGIN = 8
+
+
+def dilate(mask: NDArray[np.bool_]) -> NDArray[np.bool_]:
+    """Grow the mask by one cell in all 8 directions."""
+    grown = mask.copy(order="F")
+    grown[1:, :] |= mask[:-1, :]
+    grown[:-1, :] |= mask[1:, :]
+    rows = grown.copy(order="F")
+    grown[:, 1:] |= rows[:, :-1]
+    grown[:, :-1] |= rows[:, 1:]
+    return grown
+
+
+def erode_min(values: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Return the minimum of each cell and its 8 neighbors."""
+    smallest = values.copy(order="F")
+    np.minimum(smallest[1:, :], values[:-1, :], out=smallest[1:, :])
+    np.minimum(smallest[:-1, :], values[1:, :], out=smallest[:-1, :])
+    rows = smallest.copy(order="F")
+    np.minimum(smallest[:, 1:], rows[:, :-1], out=smallest[:, 1:])
+    np.minimum(smallest[:, :-1], rows[:, 1:], out=smallest[:, :-1])
+    return smallest
+
+
+def relative(window: Window, outer: Window) -> Window:
+    """Return `window` in the coordinates of the array of `outer`."""
+    return (
+        slice(window[0].start - outer[0].start, window[0].stop - outer[0].start),
+        slice(window[1].start - outer[1].start, window[1].stop - outer[1].start),
+    )
+
+
+class ExplorationMap:
+    """Dijkstra map of the distance from explored cells to the closest unexplored walkable cell of one actor.
+
+    Idea from http://www.roguebasin.com/index.php/The_Incredible_Power_of_Dijkstra_Maps
+
+    Distances are seeded only from the frontier, the unexplored walkable cells next to explored ones, and flow
+    only through the explored area. Exploring never shortens the distance of cells which were explored before,
+    so after the actor explored new cells only the surroundings of those cells are recomputed, see `_repair`.
+    The whole explored area is recomputed only when tiles changed or when the frontier receded far enough that
+    the repair would cover it anyway.
+    Entities are not part of the map since they move all the time; callers should skip blocked cells.
+    """
+
+    def __init__(self, game_map: GameMap, fov: Fov) -> None:
+        self.game_map = game_map
+        self.fov = fov
+        self.distances = np.full((game_map.width, game_map.height), UNREACHABLE, dtype=np.int32, order="F")
+        self._versions: tuple[int, int] | None = None
+        self._window: Window | None = None
+        self.repairs = 0
+        self.rebuilds = 0
+
+    def update(self) -> None:
+        versions = (self.fov.explored_version, self.game_map.tiles_version)
+        if versions == self._versions:
+            return
+        tiles_changed = self._versions is None or versions[1] != self._versions[1]
+        self._versions = versions
+        changed, self.fov.newly_explored = self.fov.newly_explored, None
+        if self.fov.explored_bounds is None:
+            return
+
+        if tiles_changed or changed is None or not self._repair(changed):
+            self._rebuild()
+
+    def _frontier_window(self) -> Window:
+        """Return the window of all cells which can have a distance, the frontier is next to the explored bounds."""
+        assert self.fov.explored_bounds is not None
+        return grow_window(self.fov.explored_bounds, 1, self.game_map.width, self.game_map.height)
+
+    def _rebuild(self) -> None:
+        self.rebuilds += 1
+        if self._window is not None:
+            self.distances[self._window] = UNREACHABLE
+
+        window = self._frontier_window()
+        explored = self.fov.explored[window]
+        walkable = self.game_map.walkable[window]
+        frontier = walkable & ~explored & dilate(explored)
+
+        distances = np.full(explored.shape, UNREACHABLE, dtype=np.int32, order="F")
+        distances[frontier] = 0
+        cost = (walkable & (explored | frontier)).astype(np.int8)
+        tcod.path.dijkstra2d(distances, cost, 1, 1, out=distances)
+
+        self.distances[window] = distances
+        self._window = window
+
+    def _repair(self, changed: Window) -> bool:
+        """Recompute distances around the `changed` window, growing the recomputed area until it is consistent
+        with the distances around it. Return False if the area grew to the whole explored area instead.
+
+        The recomputed area is seeded with the old distances of the ring of cells around it. Since old distances
+        never get shorter, the result is exact once every cell of that ring is still supported by a neighbor one
+        step closer to the frontier. Otherwise the frontier which the ring relied on was explored, so the area
+        is doubled.
+        """
+        width, height = self.game_map.width, self.game_map.height
+        bounds = self._frontier_window()
+        margin = REPAIR_MARGIN
+        while True:
+            window = grow_window(changed, margin, width, height)
+            if (
+                window[0].start <= bounds[0].start
+                and window[0].stop >= bounds[0].stop
+                and window[1].start <= bounds[1].start
+                and window[1].stop >= bounds[1].stop
+            ):
+                return False
+            if self._repair_window(window):
+                self.repairs += 1
+                self._window = bounds
+                return True
+            margin *= 2
+
+    def _repair_window(self, window: Window) -> bool:
+        width, height = self.game_map.width, self.game_map.height
+        ring = grow_window(window, 1, width, height)
+        outer = grow_window(window, 2, width, height)
+        inner, ring_in_outer = relative(window, outer), relative(ring, outer)
+
+        explored = self.fov.explored[outer]
+        walkable = self.game_map.walkable[outer]
+        # Only correct inside `ring`, whose neighbors are all within `outer`.
+        frontier = walkable & ~explored & dilate(explored)
+        passable = walkable & (explored | frontier)
+
+        old = self.distances[outer]
+        distances = old.copy(order="F")
+        distances[inner] = np.where(frontier[inner], 0, UNREACHABLE)
+        view = distances[ring_in_outer]
+        tcod.path.dijkstra2d(view, passable[ring_in_outer].view(np.int8), 1, 1, out=view)
+
+        # The ring must keep its old distances and each of them must still be one more than its closest neighbor.
+        on_ring = np.zeros(distances.shape, dtype=np.bool_, order="F")
+        on_ring[ring_in_outer] = True
+        on_ring[inner] = False
+        if not np.array_equal(distances[on_ring], old[on_ring]):
+            return False
+        supported = erode_min(distances.astype(np.int64)) + 1 == distances
+        needs_support = on_ring & passable & ~frontier & (distances < UNREACHABLE)
+        if not supported[needs_support].all():
+            return False
+
+        self.distances[window] = distances[inner]
+        return True
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import NamedTuple
+
+from numpy.typing import NDArray
+from tcod.map import compute_fov
+import numpy as np
+
+
+class FovKey(NamedTuple):
+    x: int
+    y: int
+    radius: int
+    transparency_version: int
+
+
+Window = tuple[slice, slice]
+
+
+class FovResult(NamedTuple):
+    """Visible cells inside `window`. Every cell outside of the window is not visible."""
+
+    window: Window
+    visible: NDArray[np.bool_]
+
+
+def fov_window(x: int, y: int, radius: int, width: int, height: int) -> Window:
+    """Return the part of the map which can be seen from (x, y) with the given radius.
+
+    A radius of 0 means unlimited sight, like in `tcod.map.compute_fov`.
+    """
+    if radius <= 0:
+        return slice(0, width), slice(0, height)
+    return (
+        slice(max(0, x - radius), min(width, x + radius + 1)),
+        slice(max(0, y - radius), min(height, y + radius + 1)),
+    )
+
+
+def union_windows(a: Window | None, b: Window) -> Window:
+    """Return the smallest window containing both windows."""
+    if a is None:
+        return b
+    return (
+        slice(min(a[0].start, b[0].start), max(a[0].stop, b[0].stop)),
+        slice(min(a[1].start, b[1].start), max(a[1].stop, b[1].stop)),
+    )
+
+
+def grow_window(window: Window, margin: int, width: int, height: int) -> Window:
+    """Return the window grown by `margin` cells on every side, clipped to the map."""
+    x_slice, y_slice = window
+    return (
+        slice(max(0, x_slice.start - margin), min(width, x_slice.stop + margin)),
+        slice(max(0, y_slice.start - margin), min(height, y_slice.stop + margin)),
+    )
+
+
+def compute_fov_result(transparent: NDArray[np.bool_], key: FovKey) -> FovResult:
+    """Compute FOV only over the window reachable by the radius."""
+    window = fov_window(key.x, key.y, key.radius, *transparent.shape)
+    x_slice, y_slice = window
+    visible = compute_fov(
+        transparent[window],
+        (key.x - x_slice.start, key.y - y_slice.start),
+        radius=key.radius,
+    )
+    visible.flags.writeable = False
+    return FovResult(window, visible)
+
+
+class FovCache:
+    """LRU cache of FOV results.
+
+    Keys include the transparency version of the map, so results never have to be invalidated explicitly:
+    stale entries are simply not requested anymore and get evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[FovKey, FovResult] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: FovKey) -> FovResult | None:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key: FovKey, result: FovResult) -> None:
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
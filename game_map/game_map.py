@@ -1,39 +1,93 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TypeVar
 
 from numpy.typing import NDArray
 from tcod.console import Console
-from tcod.map import compute_fov
 import numpy as np
 
-from entity import Item
+from entity import Actor, Entity, Interactable, Item
 from events.map_events import BaseMapEvent
 
 from . import tile_types
+from .actor_store import ActorStore
+from .exploration_map import ExplorationMap
+from .fov_cache import FovCache, FovKey, FovResult, Window, compute_fov_result, union_windows
+from .goal_maps import GoalMaps
+from .spatial_index import SpatialIndex
+from .visibility_index import VisibilityIndex
 
 if TYPE_CHECKING:
-    from entity import Actor, Entity, Interactable
     from harnesses.base_harness import BaseHarness
 
 
+EntityT = TypeVar("EntityT", bound=Entity)
+
+# Size of memory blocks for FOV buffers of actors spawned together.
+FOV_BLOCK_BYTES = 256 * 1024 * 1024
+
+# Extra pathfinding cost of a cell occupied by a blocking entity.
+BLOCKED_COST = 10
+
+
 @dataclass
 class Fov:
     visible: NDArray[np.bool_]
     explored: NDArray[np.bool_]
+    # What `visible` was computed for. Unchanged key means `visible` is up to date.
+    key: FovKey | None = None
+    # Part of `visible` which may contain visible cells.
+    window: Window | None = None
+    # Slot of the owner in GameMap.visibility.
+    slot: int = -1
+    # Bumped whenever new cells get explored.
+    explored_version: int = 0
+    # Bounding box of all explored cells.
+    explored_bounds: Window | None = None
+    # Bounding box of cells explored since the exploration map of the owner last caught up.
+    newly_explored: Window | None = None
 
 
 class GameMap:
     def __init__(self, width: int, height: int):
         self.width, self.height = width, height
         # self.entities = set(entities)
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        # Tile IDs, see tile_types.palette.
+        self.tiles = np.full((width, height), fill_value=tile_types.WALL, dtype=np.uint8, order="F")
         self.actors: set[Actor] = set()
         self.interactables: set[Interactable] = set()
         self.items: set[Item] = set()
+        self.index = SpatialIndex()
+
+        # Number of movement-blocking entities on each cell.
+        self.occupancy = np.zeros((width, height), dtype=np.int16, order="F")
+        # Pathfinding cost derived from walkability and occupancy. 0 means impassable.
+        self.movement_cost = np.zeros((width, height), dtype=np.int8, order="F")
+
+        # Properties of tiles unpacked from the palette, in contiguous arrays.
+        self.walkable = np.zeros((width, height), dtype=np.bool_, order="F")
+        self.transparent = np.zeros((width, height), dtype=np.bool_, order="F")
+        # Bumped only when the transparency of some tile changes, it invalidates cached FOVs.
+        self.transparency_version = 0
+        # Bumped whenever any tile changes.
+        self.tiles_version = 0
+        # Bumped whenever an entity spawns, moves or is removed.
+        self.entities_version = 0
+        # Bumped only when items or interactables change, so goals made of them ignore moving actors.
+        self.items_version = 0
+        self.interactables_version = 0
+        self.fov_cache = FovCache()
+        self.fov_executor: ThreadPoolExecutor | None = None
+        self.visibility = VisibilityIndex(width, height)
+        # Columnar actor state, see enable_actor_store.
+        self.actor_store: ActorStore | None = None
 
         self.fovs: dict[Actor, Fov] = {}
+        self.exploration_maps: dict[Actor, ExplorationMap] = {}
+        self.goal_maps = GoalMaps(self)
         # TODO probably should be decoulped from map, instead put it in GameWorld which will store maps
         self.harnesses: dict[Actor, BaseHarness] = {}
 
@@ -56,6 +110,14 @@ class GameMap:
     def entities(self) -> set[Actor | Interactable | Item]:
         return self.actors | self.interactables | self.items
 
+    def exploration_map(self, actor: Actor) -> ExplorationMap:
+        """Return the up to date exploration map of the actor."""
+        exploration_map = self.exploration_maps.get(actor)
+        if exploration_map is None:
+            exploration_map = self.exploration_maps[actor] = ExplorationMap(self, self.fovs[actor])
+        exploration_map.update()
+        return exploration_map
+
     @property
     def focused_fov(self) -> Fov:
         if self.focused_actor is None:
@@ -74,32 +136,178 @@ class GameMap:
     def chebyshev_distance(a: tuple[int, int], b: tuple[int, int]):
         return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
 
+    def tiles_changed(self) -> None:
+        """Rebuild the layers derived from tiles. Must be called after modifying `tiles` directly."""
+        self.tiles_version += 1
+        np.take(tile_types.palette["walkable"], self.tiles, out=self.walkable)
+        transparent = np.take(tile_types.palette["transparent"], self.tiles)
+        if not np.array_equal(transparent, self.transparent):
+            self.transparent[:] = transparent
+            self.transparency_version += 1
+
+        self.movement_cost[:] = self.walkable
+        # A lower number means more actors will crowd behind each other in hallways.
+        # A higher number means actors will take longer paths around each other.
+        self.movement_cost[(self.occupancy > 0) & self.walkable] += BLOCKED_COST
+
+    def set_tile(self, x: int, y: int, tile_id: int) -> None:
+        """Change one tile and update the derived layers."""
+        self.tiles[x, y] = tile_id
+        self.tiles_version += 1
+        tile = tile_types.palette[tile_id]
+        self.walkable[x, y] = tile["walkable"]
+        if self.transparent[x, y] != tile["transparent"]:
+            self.transparent[x, y] = tile["transparent"]
+            self.transparency_version += 1
+        self.movement_cost[x, y] = 0
+        self._update_cell_cost(x, y)
+
+    def _update_cell_cost(self, x: int, y: int) -> None:
+        if not self.walkable[x, y]:
+            return
+        self.movement_cost[x, y] = 1 + BLOCKED_COST if self.occupancy[x, y] else 1
+
+    def _occupy(self, x: int, y: int, amount: int) -> None:
+        self.occupancy[x, y] += amount
+        self._update_cell_cost(x, y)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """Return True if the tile is not walkable or a blocking entity stands on it."""
+        return not self.walkable[x, y] or self.occupancy[x, y] > 0
+
     def handle_event(self, event: BaseMapEvent) -> None:
-        for actor in self.actors:
-            fov = self.fovs[actor]
-            if fov.visible[event.x, event.y]:
+        self.handle_events([event])
+
+    def handle_events(self, events: list[BaseMapEvent]) -> None:
+        """Deliver each event to every actor who sees the cell where it happened."""
+        if not events:
+            return
+
+        observers = self.visibility.observers([event.x for event in events], [event.y for event in events])
+        for event, slots in zip(events, observers.T):
+            for slot in np.flatnonzero(slots):
+                actor = self.visibility.actors[slot]
+                assert actor is not None
                 actor.handle_external_event(event)
 
+    def enable_batched_fov(self, workers: int | None = None) -> None:
+        """Compute FOVs of all dirty actors in parallel on a thread pool.
+
+        tcod releases the GIL while computing FOV, so threads scale across cores without copying the map.
+        `workers` defaults to the number of CPUs.
+        """
+        self.disable_batched_fov()
+        self.fov_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fov")
+
+    def disable_batched_fov(self) -> None:
+        if self.fov_executor is not None:
+            self.fov_executor.shutdown()
+            self.fov_executor = None
+
+    def enable_actor_store(self) -> ActorStore:
+        """Keep the state of all actors of the map in a columnar ActorStore and return it.
+
+        Actors keep working as before, but systems can also update every actor at once through the store.
+        """
+        if self.actor_store is None:
+            self.actor_store = ActorStore(self.visibility.actors, len(self.visibility.packed))
+            actors = list(self.actors)
+            self.actor_store.add_many(actors, [self.fovs[actor].slot for actor in actors])
+        return self.actor_store
+
+    def disable_actor_store(self) -> None:
+        """Move the state of actors back into their objects."""
+        if self.actor_store is not None:
+            for slot in self.actor_store.live_slots():
+                self.actor_store.remove(slot)
+            self.actor_store = None
+
     def update_fov(self) -> None:
+        """Recompute FOVs of actors which moved or whose surroundings changed."""
+        dirty: dict[FovKey, list[Fov]] = {}
         for actor in self.actors:
             fov = self.fovs[actor]
-            fov.visible[:] = compute_fov(
-                self.tiles["transparent"],
-                (actor.x, actor.y),
-                radius=actor.eyesight,
-            )
-
-            fov.explored |= fov.visible
+            key = FovKey(actor.x, actor.y, actor.eyesight, self.transparency_version)
+            if fov.key != key:
+                dirty.setdefault(key, []).append(fov)
+
+        # The cache is not thread-safe, so it is only touched from this thread.
+        batch = [(key, fovs, self.fov_cache.get(key)) for key, fovs in dirty.items()]
+        if self.fov_executor is not None and len(batch) > 1:
+            results = list(self.fov_executor.map(lambda job: self._refresh_fovs(*job), batch))
+        else:
+            results = [self._refresh_fovs(*job) for job in batch]
+
+        for (key, _, cached), result in zip(batch, results):
+            if cached is None:
+                self.fov_cache.put(key, result)
+
+    def _refresh_fovs(self, key: FovKey, fovs: list[Fov], result: FovResult | None) -> FovResult:
+        """Write the FOV for `key` into every given Fov, computing it if it wasn't cached."""
+        if result is None:
+            result = compute_fov_result(self.transparent, key)
+
+        for fov in fovs:
+            if fov.window is not None:
+                fov.visible[fov.window] = False
+                self.visibility.update(fov.slot, fov.visible, fov.window)
+            fov.visible[result.window] = result.visible
+            explored = fov.explored[result.window]
+            if (result.visible & ~explored).any():
+                explored |= result.visible
+                fov.explored_version += 1
+                fov.explored_bounds = union_windows(fov.explored_bounds, result.window)
+                fov.newly_explored = union_windows(fov.newly_explored, result.window)
+            fov.key = key
+            fov.window = result.window
+            self.visibility.update(fov.slot, fov.visible, fov.window)
+
+        return result
 
     def can_spawn_at(self, x: int, y: int) -> bool:
         """Return True if an entity can spawn at this location."""
-        return self.in_bounds(x, y) and not self.get_blocking_entity_at_location(x, y)
+        return self.in_bounds(x, y) and not self.occupancy[x, y]
+
+    def _entity_changed(self, entity: Entity) -> None:
+        self.entities_version += 1
+        if isinstance(entity, Item):
+            self.items_version += 1
+        elif isinstance(entity, Interactable):
+            self.interactables_version += 1
+
+    def _place(self, entity: Entity) -> None:
+        entity.game_map = self
+        self.index.add(entity)
+        self._entity_changed(entity)
+        if entity.blocks_movement:
+            self._occupy(entity.x, entity.y, 1)
+
+    def entity_moved(self, entity: Entity, old_x: int, old_y: int) -> None:
+        """Update the index and layers after an entity moved from (old_x, old_y)."""
+        self.index.move(entity, old_x, old_y)
+        self._entity_changed(entity)
+        if entity.blocks_movement:
+            self._occupy(old_x, old_y, -1)
+            self._occupy(entity.x, entity.y, 1)
 
     def spawn_actor(self, actor: Actor) -> None:
+        self._add_actor(actor)
+        if self.actor_store is not None:
+            self.actor_store.add(actor, self.fovs[actor].slot)
+        self._place(actor)
+
+    def _add_actor(self, actor: Actor, buffers: NDArray[np.bool_] | None = None) -> None:
+        """Register an actor with its FOV.
+
+        `buffers` is a zeroed (2, height, width) array for the visible and explored arrays.
+        """
+        if buffers is None:
+            buffers = next(self._allocate_fov_buffers(1))
         self.actors.add(actor)
         self.fovs[actor] = Fov(
-            visible=np.full((self.width, self.height), fill_value=False, order="F"),
-            explored=np.full((self.width, self.height), fill_value=False, order="F"),
+            visible=buffers[0].T,
+            explored=buffers[1].T,
+            slot=self.visibility.add(actor),
         )
         if self.focused_actor is None:
             self.focused_actor = actor
@@ -110,29 +318,169 @@ class GameMap:
 
     def spawn_interactable(self, interactable: Interactable) -> None:
         self.interactables.add(interactable)
+        self._place(interactable)
 
     def spawn_item(self, item: Item) -> None:
         self.items.add(item)
+        self._place(item)
+
+    def _allocate_fov_buffers(self, count: int) -> Iterator[NDArray[np.bool_]]:
+        """Yield zeroed (2, height, width) FOV buffers for `count` actors.
+
+        Buffers are allocated in large blocks which the OS maps lazily, so unexplored parts of the map cost
+        nothing. Transposing a (height, width) buffer gives the Fortran-ordered (width, height) array used
+        everywhere else.
+        """
+        per_block = max(1, FOV_BLOCK_BYTES // (2 * self.width * self.height))
+        while count > 0:
+            block = np.zeros((min(count, per_block), 2, self.height, self.width), dtype=np.bool_)
+            yield from block
+            count -= len(block)
+
+    def spawn_many(
+        self,
+        xs: Sequence[int] | NDArray[np.integer],
+        ys: Sequence[int] | NDArray[np.integer],
+        factory: Callable[[int, int], EntityT],
+    ) -> list[EntityT]:
+        """Create an entity with `factory` at each of the given coordinates and spawn them all at once.
+
+        Layers are updated with one array operation instead of once per entity.
+        """
+        entities = [factory(x, y) for x, y in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist())]
+
+        # Group by class first, isinstance checks against ABCs are slow.
+        by_class: dict[type[Entity], list[Entity]] = {}
+        for entity in entities:
+            by_class.setdefault(type(entity), []).append(entity)
+
+        for cls, group in by_class.items():
+            if issubclass(cls, Actor):
+                self.visibility.reserve(len(self.visibility.actors) + len(group))
+                for actor, buffers in zip(group, self._allocate_fov_buffers(len(group))):
+                    self._add_actor(actor, buffers)  # type: ignore[arg-type]
+                if self.actor_store is not None:
+                    slots = [self.fovs[actor].slot for actor in group]  # type: ignore[index]
+                    self.actor_store.add_many(group, slots)  # type: ignore[arg-type]
+            elif issubclass(cls, Interactable):
+                self.interactables.update(group)  # type: ignore[arg-type]
+                self.interactables_version += 1
+            elif issubclass(cls, Item):
+                self.items.update(group)  # type: ignore[arg-type]
+                self.items_version += 1
+
+        for entity in entities:
+            entity.game_map = self
+            self.index.add(entity)
+        self.entities_version += 1
+
+        blocking = [entity for entity in entities if entity.blocks_movement]
+        if blocking:
+            bx = np.fromiter((entity.x for entity in blocking), dtype=np.intp, count=len(blocking))
+            by = np.fromiter((entity.y for entity in blocking), dtype=np.intp, count=len(blocking))
+            np.add.at(self.occupancy, (bx, by), 1)
+            self.movement_cost[bx, by] = np.where(self.walkable[bx, by], 1 + BLOCKED_COST, 0)
+        return entities
+
+    def free_cells(self) -> NDArray[np.bool_]:
+        """Return a mask of walkable cells with no entities on them."""
+        free = self.walkable.copy(order="F")
+        free[self.index.occupied_cells()] = False
+        return free
+
+    def sample_free_cells(
+        self,
+        count: int,
+        rng: np.random.Generator,
+        mask: NDArray[np.bool_] | None = None,
+    ) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Pick up to `count` distinct free cells, only where `mask` is True if it is given."""
+        free = self.free_cells()
+        if mask is not None:
+            free &= mask
+        candidates = np.flatnonzero(free.ravel(order="F"))
+        chosen = rng.choice(candidates, size=min(count, len(candidates)), replace=False)
+        return np.unravel_index(chosen, free.shape, order="F")  # type: ignore[return-value]
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from the map, e.g. when an item is picked up."""
+        if entity in self.actors:
+            self.actors.remove(entity)  # type: ignore[arg-type]
+            slot = self.fovs.pop(entity).slot  # type: ignore[arg-type]
+            if self.actor_store is not None:
+                self.actor_store.remove(slot)
+            self.visibility.remove(slot)
+            self.exploration_maps.pop(entity, None)  # type: ignore[arg-type]
+            if self.focused_actor is entity:
+                self.focused_actor = next(iter(self.actors), None)
+        self.interactables.discard(entity)  # type: ignore[arg-type]
+        self.items.discard(entity)  # type: ignore[arg-type]
+        self.index.remove(entity)
+        self._entity_changed(entity)
+        if entity.blocks_movement:
+            self._occupy(entity.x, entity.y, -1)
+        entity.game_map = None
+
+    def entities_within(
+        self,
+        x: int,
+        y: int,
+        radius: int,
+        kind: type[EntityT] = Entity,  # type: ignore[assignment]
+        mask: NDArray[np.bool_] | None = None,
+    ) -> list[EntityT]:
+        """Return entities of the kind within the Chebyshev radius, closest first.
+
+        If `mask` is given, e.g. the explored cells of an actor, only entities on cells where it is True are returned.
+        """
+        return [
+            entity
+            for _, entity in self.index.within(x, y, radius)
+            if isinstance(entity, kind) and (mask is None or mask[entity.x, entity.y])
+        ]
+
+    def nearest(
+        self,
+        x: int,
+        y: int,
+        k: int,
+        kind: type[EntityT] = Entity,  # type: ignore[assignment]
+        predicate: Callable[[EntityT], bool] | None = None,
+        radius: int | None = None,
+        mask: NDArray[np.bool_] | None = None,
+    ) -> list[EntityT]:
+        """Return up to `k` entities of the kind closest to (x, y) by Chebyshev distance, closest first."""
+        if radius is None:
+            radius = max(self.width, self.height)
+
+        def matches(entity: Entity) -> bool:
+            return (
+                isinstance(entity, kind)
+                and (mask is None or mask[entity.x, entity.y])
+                and (predicate is None or predicate(entity))
+            )
+
+        return [entity for _, entity in self.index.nearest(x, y, k, radius, matches)]  # type: ignore[misc]
 
     def get_blocking_entity_at_location(
         self,
         location_x: int,
         location_y: int,
     ) -> Entity | None:
-        for entity in self.entities:
-            if entity.blocks_movement and entity.x == location_x and entity.y == location_y:
+        for entity in self.index.at(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
-    
+
     def get_interactable_at_location(
         self,
         location_x: int,
         location_y: int,
     ) -> Interactable | None:
-        for interactable in self.interactables:
-            if interactable.x == location_x and interactable.y == location_y:
-                return interactable
+        for entity in self.index.at(location_x, location_y):
+            if isinstance(entity, Interactable):
+                return entity
 
         return None
 
@@ -141,9 +489,9 @@ class GameMap:
         location_x: int,
         location_y: int,
     ) -> Item | None:
-        for item in self.items:
-            if item.x == location_x and item.y == location_y:
-                return item
+        for entity in self.index.at(location_x, location_y):
+            if isinstance(entity, Item):
+                return entity
 
         return None
     # def get_actor_at_location(self, x: int, y: int) -> Actor | None:
@@ -180,11 +528,13 @@ class GameMap:
         If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
         Otherwise, the default is "SHROUD".
         """
-        console.rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.focused_fov.visible, self.focused_fov.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
-            default=tile_types.SHROUD,
+        palette_size = len(tile_types.palette)
+        graphics = np.where(
+            self.focused_fov.visible,
+            self.tiles,
+            np.where(self.focused_fov.explored, self.tiles + palette_size, 2 * palette_size),
         )
+        console.rgb[0 : self.width, 0 : self.height] = tile_types.render_table[graphics]
 
         entities_sorted_for_rendering = sorted(self.entities, key=lambda x: x.render_order.value)
 
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable
+from typing import TYPE_CHECKING
+
+from numpy.typing import NDArray
+import numpy as np
+import tcod.path
+
+from components.consumable import Food
+
+from . import tile_types
+from .exploration_map import dilate
+
+if TYPE_CHECKING:
+    from entity import Actor, Entity
+
+    from .game_map import GameMap
+
+# Returns a mask of the goal cells of a map.
+GoalSource = Callable[["GameMap"], NDArray[np.bool_]]
+# Returns a ready distance map for one actor, for goals which differ between actors.
+ActorGoalSource = Callable[["GameMap", "Actor"], NDArray[np.int32]]
+# Returns a value which changes whenever the goal cells of a source may have changed.
+GoalVersion = Callable[["GameMap"], Hashable]
+
+
+def entity_cells(game_map: GameMap, entities: Iterable[Entity]) -> NDArray[np.bool_]:
+    mask = np.zeros((game_map.width, game_map.height), dtype=np.bool_, order="F")
+    for entity in entities:
+        mask[entity.x, entity.y] = True
+    return mask
+
+
+def food_cells(game_map: GameMap) -> NDArray[np.bool_]:
+    return entity_cells(game_map, (item for item in game_map.items if isinstance(item.consumable, Food)))
+
+
+def interactable_cells(game_map: GameMap) -> NDArray[np.bool_]:
+    return entity_cells(game_map, game_map.interactables)
+
+
+def water_adjacent_cells(game_map: GameMap) -> NDArray[np.bool_]:
+    return game_map.walkable & dilate(game_map.tiles == tile_types.WATER)
+
+
+def tiles_version(game_map: GameMap) -> Hashable:
+    return game_map.tiles_version
+
+
+def food_version(game_map: GameMap) -> Hashable:
+    return game_map.tiles_version, game_map.items_version
+
+
+def interactables_version(game_map: GameMap) -> Hashable:
+    return game_map.tiles_version, game_map.interactables_version
+
+
+def entities_version(game_map: GameMap) -> Hashable:
+    return game_map.tiles_version, game_map.entities_version
+
+
+def unexplored_distances(game_map: GameMap, actor: Actor) -> NDArray[np.int32]:
+    return game_map.exploration_map(actor).distances
+
+
+class GoalMaps:
+    """Named Dijkstra maps shared by every harness on a map.
+
+    A goal map holds the travel cost from each walkable cell to the closest goal cell. Entities are not part of
+    the costs since actors move all the time; callers should skip blocked cells, as `step_downhill` does.
+    Maps are computed on first request and reused until the version of their goal changes, e.g. for food only
+    when tiles or items change, so many actors seeking the same goal cost one computation per change rather
+    than one per actor.
+    """
+
+    def __init__(self, game_map: GameMap) -> None:
+        self.game_map = game_map
+        self.sources: dict[str, tuple[GoalSource, GoalVersion]] = {}
+        self.actor_sources: dict[str, ActorGoalSource] = {}
+        self._maps: dict[str, tuple[Hashable, NDArray[np.int32]]] = {}
+
+        self.register("food", food_cells, food_version)
+        self.register("interactables", interactable_cells, interactables_version)
+        self.register("water", water_adjacent_cells, tiles_version)
+        self.register_per_actor("unexplored", unexplored_distances)
+
+    def register(self, name: str, source: GoalSource, version: GoalVersion = entities_version) -> None:
+        """Add a goal. Its map is recomputed whenever `version` changes, by default when tiles or entities do."""
+        self.sources[name] = (source, version)
+        self.invalidate(name)
+
+    def register_per_actor(self, name: str, source: ActorGoalSource) -> None:
+        self.actor_sources[name] = source
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Force recomputation of one or all goal maps, e.g. after changing what a goal source returns."""
+        if name is None:
+            self._maps.clear()
+        else:
+            self._maps.pop(name, None)
+
+    def get(self, name: str, actor: Actor | None = None) -> NDArray[np.int32]:
+        """Return the distance map of the goal. Per-actor goals require `actor`."""
+        if name in self.actor_sources:
+            if actor is None:
+                raise ValueError(f"Goal {name} is computed per actor, but no actor was given.")
+            return self.actor_sources[name](self.game_map, actor)
+
+        source, version_of = self.sources[name]
+        version = version_of(self.game_map)
+        cached = self._maps.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        distances = tcod.path.maxarray((self.game_map.width, self.game_map.height), dtype=np.int32, order="F")
+        distances[source(self.game_map)] = 0
+        tcod.path.dijkstra2d(distances, self.game_map.walkable.view(np.int8), 2, 3, out=distances)
+        self._maps[name] = (version, distances)
+        return distances
+
+    def step_downhill(self, name: str, x: int, y: int, actor: Actor | None = None) -> tuple[int, int] | None:
+        """Return the step towards the closest goal from (x, y), or None if no free neighbor is closer."""
+        distances = self.get(name, actor)
+        game_map = self.game_map
+        best, step = distances[x, y], None
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if (dx or dy) and game_map.in_bounds(nx, ny) and not game_map.occupancy[nx, ny]:
+                    if distances[nx, ny] < best:
+                        best, step = distances[nx, ny], (dx, dy)
+        return step
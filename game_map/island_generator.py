@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any
 
 from numpy.typing import NDArray
+import numpy as np
 import tcod
 import tcod.noise
 
@@ -10,7 +12,28 @@ from game_map import tile_types
 from game_map.game_map import GameMap
 
 
-def generate_heightmap(width: int, height: int, scale: float, octaves: int, lacunarity: float) -> NDArray[Any]:
+@dataclass(frozen=True)
+class IslandSettings:
+    """Parameters of island generation. Height thresholds are compared against the noise after the falloff."""
+
+    seed: int = 42
+    scale: float = 0.09
+    octaves: int = 6
+    lacunarity: float = 2.0
+    water_level: float = 0.15  # Below is water.
+    sand_level: float = 0.2  # Below is sand.
+    forrest_level: float = 0.4  # Above is forrest.
+    mountain_level: float = 0.7  # Above is mountain.
+
+
+def generate_heightmap(
+    width: int,
+    height: int,
+    scale: float,
+    octaves: int,
+    lacunarity: float,
+    seed: int = 42,
+) -> NDArray[Any]:
     shape = (width, height)
 
     noise = tcod.noise.Noise(
@@ -19,7 +42,7 @@ def generate_heightmap(width: int, height: int, scale: float, octaves: int, lacu
         implementation=0,
         octaves=octaves,
         lacunarity=lacunarity,
-        seed=42,
+        seed=seed,
     )
     samples = noise[tcod.noise.grid(shape, scale, origin=(0, 0))]
 
@@ -29,39 +52,39 @@ def generate_heightmap(width: int, height: int, scale: float, octaves: int, lacu
 def generate_island(
     map_width: int,
     map_height: int,
-):
+    settings: IslandSettings = IslandSettings(),
+) -> GameMap:
     """Generate a new island map."""
-
     height_map = generate_heightmap(
         width=map_width,
         height=map_height,
-        scale=0.09,
-        octaves=6,
-        lacunarity=2.0,
-    )
+        scale=settings.scale,
+        octaves=settings.octaves,
+        lacunarity=settings.lacunarity,
+        seed=settings.seed,
+    ).T
 
+    # Height falls off towards the edges of the map, so the land is surrounded by water.
     x_center = map_width // 2
     y_center = map_height // 2
+    xs = np.arange(map_width)[:, np.newaxis]
+    ys = np.arange(map_height)[np.newaxis, :]
+    len_from_center = np.maximum(np.abs(x_center - xs) / x_center, np.abs(y_center - ys) / y_center)
+    h = height_map * (1 - len_from_center)
+    border = (xs == 0) | (ys == 0) | (xs == map_width - 1) | (ys == map_height - 1)
 
-    island = GameMap(map_width, map_height)
-    for x in range(map_width):
-        for y in range(map_height):
-            len_from_center_x = abs(x_center - x) / x_center
-            len_from_center_y = abs(y_center - y) / y_center
-
-            h = height_map[y][x] * (1 - max(len_from_center_x, len_from_center_y))
-
-            if x == 0 or y == 0 or x == map_width - 1 or y == map_height - 1:
-                island.tiles[x, y] = tile_types.water
-            elif h < 0.15:
-                island.tiles[x, y] = tile_types.water
-            elif h < 0.2:
-                island.tiles[x, y] = tile_types.sand
-            elif h > 0.7:
-                island.tiles[x, y] = tile_types.mountain
-            elif 0.4 < h < 0.7:
-                island.tiles[x, y] = tile_types.forrest
-            else:
-                island.tiles[x, y] = tile_types.grass
+    tiles = np.select(
+        condlist=[
+            border | (h < settings.water_level),
+            h < settings.sand_level,
+            h > settings.mountain_level,
+            (settings.forrest_level < h) & (h < settings.mountain_level),
+        ],
+        choicelist=[tile_types.WATER, tile_types.SAND, tile_types.MOUNTAIN, tile_types.FORREST],
+        default=tile_types.GRASS,
+    )
 
+    island = GameMap(map_width, map_height)
+    island.tiles = np.asfortranarray(tiles, dtype=np.uint8)
+    island.tiles_changed()
     return island
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import heapq
+from typing import TYPE_CHECKING
+
+from numpy.typing import NDArray
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+
+class SpatialIndex:
+    """Grid-bucketed index of entities by the cell they occupy.
+
+    Buckets are created lazily, so memory grows with the number of occupied cells rather than the map area.
+    A cell holds very few entities in practice, so point lookups are O(1).
+    """
+
+    def __init__(self) -> None:
+        self._cells: dict[tuple[int, int], list[Entity]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._cells.values())
+
+    def add(self, entity: Entity) -> None:
+        self._cells.setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove(self, entity: Entity, x: int | None = None, y: int | None = None) -> None:
+        """Remove the entity from the bucket at (x, y), which defaults to its current position."""
+        key = (entity.x if x is None else x, entity.y if y is None else y)
+        bucket = self._cells[key]
+        bucket.remove(entity)
+        if not bucket:
+            del self._cells[key]
+
+    def move(self, entity: Entity, old_x: int, old_y: int) -> None:
+        """Move the entity from (old_x, old_y) to its current position."""
+        self.remove(entity, old_x, old_y)
+        self.add(entity)
+
+    def at(self, x: int, y: int) -> list[Entity]:
+        """Return the entities at (x, y). The returned list must not be modified."""
+        return self._cells.get((x, y), [])
+
+    def within(self, x: int, y: int, radius: int) -> list[tuple[int, Entity]]:
+        """Return entities within the Chebyshev radius with their distances, sorted by distance, then x and y."""
+        found: list[tuple[int, int, int, Entity]] = []
+        if (2 * radius + 1) ** 2 <= len(self._cells):
+            for distance in range(radius + 1):
+                for cell in ring(x, y, distance):
+                    for entity in self._cells.get(cell, ()):
+                        found.append((distance, entity.x, entity.y, entity))
+        else:
+            # Fewer occupied cells than cells in the area, scanning them is cheaper.
+            for (cx, cy), bucket in self._cells.items():
+                distance = max(abs(cx - x), abs(cy - y))
+                if distance <= radius:
+                    found.extend((distance, cx, cy, entity) for entity in bucket)
+        found.sort(key=lambda item: item[:3])
+        return [(distance, entity) for distance, _, _, entity in found]
+
+    def nearest(
+        self,
+        x: int,
+        y: int,
+        k: int,
+        radius: int,
+        predicate: Callable[[Entity], bool],
+    ) -> list[tuple[int, Entity]]:
+        """Return up to `k` closest entities within the radius matching the predicate, sorted by distance.
+
+        Searches ring by ring outwards, so nearby results are found without looking at the rest of the map.
+        """
+        found: list[tuple[int, int, int, Entity]] = []
+        probed = 0
+        for distance in range(radius + 1):
+            if probed > len(self._cells):
+                # The matches are sparse, scanning every occupied cell is cheaper than probing further.
+                matches = (
+                    (max(abs(cx - x), abs(cy - y)), cx, cy, entity)
+                    for (cx, cy), bucket in self._cells.items()
+                    for entity in bucket
+                    if max(abs(cx - x), abs(cy - y)) <= radius and predicate(entity)
+                )
+                found = heapq.nsmallest(k, matches, key=lambda item: item[:3])
+                break
+            for cell in ring(x, y, distance):
+                probed += 1
+                for entity in self._cells.get(cell, ()):
+                    if predicate(entity):
+                        found.append((distance, entity.x, entity.y, entity))
+            if len(found) >= k:
+                break
+        found.sort(key=lambda item: item[:3])
+        return [(distance, entity) for distance, _, _, entity in found[:k]]
+
+    def occupied_cells(self) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Return x and y coordinates of every cell with at least one entity."""
+        cells = np.array(list(self._cells), dtype=np.intp).reshape(-1, 2)
+        return cells[:, 0], cells[:, 1]
+
+    def __iter__(self) -> Iterator[Entity]:
+        for bucket in self._cells.values():
+            yield from bucket
+
+
+def ring(x: int, y: int, distance: int) -> Iterator[tuple[int, int]]:
+    """Yield the cells at exactly the given Chebyshev distance from (x, y)."""
+    if distance == 0:
+        yield x, y
+        return
+    for cx in range(x - distance, x + distance + 1):
+        yield cx, y - distance
+        yield cx, y + distance
+    for cy in range(y - distance + 1, y + distance):
+        yield x - distance, cy
+        yield x + distance, cy
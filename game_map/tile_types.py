@@ -109,3 +109,11 @@ mountain = new_tile(
     light=(ord(" "), (255, 255, 255), (255, 255, 255)),
     name="mountain",
 )
+
+# Every tile type, indexed by tile ID. Maps store a grid of tile IDs and look the records up here.
+palette = np.stack([floor, wall, water, sand, grass, forrest, mountain])
+FLOOR, WALL, WATER, SAND, GRASS, FORREST, MOUNTAIN = range(len(palette))
+
+# Graphics of every tile ID when lit, then when dark, followed by SHROUD.
+# Lets a renderer pick the graphic of each cell with a single gather.
+render_table = np.concatenate([palette["light"], palette["dark"], SHROUD[np.newaxis]])
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from numpy.typing import NDArray
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+    from .fov_cache import Window
+
+
+class VisibilityIndex:
+    """Visible cells of all actors stacked into one bit-packed (slots x width x ceil(height / 8)) array.
+
+    Each actor owns a dense slot. Finding who sees a batch of cells is a single gather over the stack
+    instead of a Python loop over actors.
+    """
+
+    def __init__(self, width: int, height: int, capacity: int = 16) -> None:
+        self.width, self.height = width, height
+        self.packed = np.zeros((capacity, width, (height + 7) // 8), dtype=np.uint8)
+        self.actors: list[Actor | None] = []
+        self._free_slots: list[int] = []
+
+    def add(self, actor: Actor) -> int:
+        """Allocate a slot for the actor and return it."""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self.actors[slot] = actor
+            return slot
+
+        slot = len(self.actors)
+        if slot == len(self.packed):
+            self.reserve(2 * len(self.packed))
+        self.actors.append(actor)
+        return slot
+
+    def reserve(self, capacity: int) -> None:
+        """Make room for at least `capacity` slots, so spawning many actors does not grow the stack repeatedly."""
+        if capacity <= len(self.packed):
+            return
+        grown = np.zeros((capacity, *self.packed.shape[1:]), dtype=np.uint8)
+        grown[: len(self.actors)] = self.packed[: len(self.actors)]
+        self.packed = grown
+
+    def remove(self, slot: int) -> None:
+        self.packed[slot] = 0
+        self.actors[slot] = None
+        self._free_slots.append(slot)
+
+    def update(self, slot: int, visible: NDArray[np.bool_], window: Window) -> None:
+        """Copy `window` of the visibility array into the slot.
+
+        The window is widened to whole bytes along the y axis.
+        """
+        x_slice, y_slice = window
+        first_byte = y_slice.start // 8
+        last_byte = (y_slice.stop + 7) // 8
+        self.packed[slot, x_slice, first_byte:last_byte] = np.packbits(
+            visible[x_slice, first_byte * 8 : last_byte * 8], axis=1
+        )
+
+    def observers(self, xs: Sequence[int] | NDArray[np.intp], ys: Sequence[int] | NDArray[np.intp]) -> NDArray[np.bool_]:
+        """Return a (slots x cells) mask of which slots see each of the given cells."""
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        used = len(self.actors)
+        bytes_ = self.packed[:used, xs, ys >> 3]
+        return ((bytes_ >> (7 - (ys & 7)).astype(np.uint8)) & 1).astype(np.bool_)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-import numpy as np
 import tcod
 
 from actions import Action
@@ -15,8 +15,31 @@ if TYPE_CHECKING:
     from entity import Actor
 
 
+@dataclass
+class PathCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class CachedPath:
+    destination: tuple[int, int]
+    # Remaining steps, the first one is the next step of the actor.
+    steps: list[tuple[int, int]]
+    # Where the actor stood when the first of the steps was computed.
+    origin: tuple[int, int]
+    tiles_version: int
+
+
 class BaseHarness(ABC):
     actor: Actor
+    # Shared by all harnesses.
+    path_cache_stats = PathCacheStats()
 
     def __init__(
         self,
@@ -26,23 +49,60 @@ class BaseHarness(ABC):
         self.game_map = Engine.instance().game_map
         self.actor = actor
         self.stop_triggers = stop_triggers
+        self._cached_path: CachedPath | None = None
 
     def get_path_to(self, dest_x: int, dest_y: int) -> list[tuple[int, int]]:
-        """Compute and return a path to the target position.
+        """Return a path to the target position.
+
+        The path is cached, so walking it over several ticks costs a single pathfinding.
+        It is recomputed when the destination or a tile on the path changes, when the next step is blocked or
+        when the actor left the path.
 
         If there is no valid path then returns an empty list.
         """
-        cost = np.array(self.game_map.tiles["walkable"], dtype=np.int8)
-
-        # TODO this implementation might be not fitting for all cases
-        for entity in self.game_map.entities:
-            # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += 10
+        steps = self._get_cached_path(dest_x, dest_y)
+        if steps is not None:
+            self.path_cache_stats.hits += 1
+            return list(steps)
+
+        self.path_cache_stats.misses += 1
+        steps = self._compute_path_to(dest_x, dest_y)
+        self._cached_path = CachedPath(
+            (dest_x, dest_y), steps, (self.actor.x, self.actor.y), self.game_map.tiles_version
+        )
+        return list(steps)
+
+    def _get_cached_path(self, dest_x: int, dest_y: int) -> list[tuple[int, int]] | None:
+        cached = self._cached_path
+        if cached is None or cached.destination != (dest_x, dest_y) or not cached.steps:
+            return None
+
+        # Skip the steps the actor made since the last call.
+        position = (self.actor.x, self.actor.y)
+        if position != cached.origin:
+            if position not in cached.steps:
+                return None
+            del cached.steps[: cached.steps.index(position) + 1]
+            cached.origin = position
+            if not cached.steps:
+                return None
+
+        game_map = self.game_map
+        if cached.tiles_version != game_map.tiles_version:
+            if not all(game_map.walkable[x, y] for x, y in cached.steps):
+                return None
+            cached.tiles_version = game_map.tiles_version
+
+        # The destination itself may be occupied, e.g. by an interactable.
+        next_x, next_y = cached.steps[0]
+        if len(cached.steps) > 1 and game_map.occupancy[next_x, next_y]:
+            return None
+
+        return cached.steps
+
+    def _compute_path_to(self, dest_x: int, dest_y: int) -> list[tuple[int, int]]:
+        # The map keeps this layer up to date as entities spawn, move and despawn.
+        cost = self.game_map.movement_cost
 
         # Create a graph from the cost array and pass that graph to a new pathfinder.
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
@@ -60,8 +120,10 @@ class BaseHarness(ABC):
         """Returns the next proposed action."""
 
     def stop(self) -> None:
-        """Stop the harness."""
-        self.actor.harness = None
+        """Stop the harness, so the AI of the actor chooses another one."""
+        ai = getattr(self.actor, "ai", None)  # Not set yet if the harness stops while the AI is being created.
+        if ai is not None and ai.harness is self:
+            ai.harness = None
 
     def handle_event(self, event: BaseEvent) -> None | str:
         """Handle events for this harness."""
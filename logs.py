@@ -0,0 +1,164 @@
+"""Logging of the engine, split into subsystems with their own levels and sampling.
+
+Messages go through loguru to a sink which only queues them. A background thread writes the queue to the file
+in batches, so logging does not block the tick on I/O.
+"""
+from __future__ import annotations
+
+from typing import Any, TextIO
+import atexit
+import os
+import queue
+import random
+import threading
+
+from loguru import logger
+
+FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {extra[subsystem]} | {message}"
+
+
+class BatchWriter:
+    """Loguru sink handing formatted messages to a thread which writes everything queued so far at once."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._queue: queue.SimpleQueue[str | threading.Event | None] = queue.SimpleQueue()
+        self._file: TextIO = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message: str) -> None:
+        self._queue.put(message)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 4096:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._file.write("".join(item for item in batch if isinstance(item, str)))
+            self._file.flush()
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                self._file.close()
+                return
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is written."""
+        if self._thread.is_alive():
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class Subsystem:
+    """Logger of one subsystem, e.g. "observations".
+
+    Level and sampling are checked before loguru builds a record, so filtered messages cost almost nothing.
+    Messages take `str.format` arguments, which are only formatted for messages that get logged.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.level = _default_level
+        # Fraction of messages which get logged.
+        self.sample_rate = 1.0
+        self._logger = logger.bind(subsystem=name).opt(depth=1)
+
+    def configure(self, level: str | None = None, sample_rate: float | None = None) -> None:
+        if level is not None:
+            self.level = logger.level(level).no
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def log(self, level: str, message: str, *args: Any, **kwargs: Any) -> None:
+        if logger.level(level).no < self.level:
+            return
+        if self.sample_rate < 1.0 and _sampling.random() >= self.sample_rate:
+            return
+        self._logger.log(level, message, *args, **kwargs)
+
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
+        if self.level <= DEBUG:
+            self.log("DEBUG", message, *args, **kwargs)
+
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
+        if self.level <= INFO:
+            self.log("INFO", message, *args, **kwargs)
+
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self.log("WARNING", message, *args, **kwargs)
+
+
+DEBUG = logger.level("DEBUG").no
+INFO = logger.level("INFO").no
+
+# Level of subsystems which are not configured explicitly.
+_default_level = INFO
+
+# Separate from the global random generator, so sampling logs does not change the course of the game.
+_sampling = random.Random()
+_subsystems: dict[str, Subsystem] = {}
+_writer: BatchWriter | None = None
+
+
+def get_logger(subsystem: str) -> Subsystem:
+    if subsystem not in _subsystems:
+        _subsystems[subsystem] = Subsystem(subsystem)
+    return _subsystems[subsystem]
+
+
+def configure_logging(
+    path: str | os.PathLike[str] = "log.txt",
+    level: str = "INFO",
+    levels: dict[str, str] | None = None,
+    sample_rates: dict[str, float] | None = None,
+) -> None:
+    """Send logs to a file through a background writer.
+
+    `levels` and `sample_rates` override the level and the fraction of logged messages of single subsystems.
+    """
+    global _writer, _default_level
+    logger.remove()
+    stop_logging()
+    _writer = BatchWriter(path)
+    logger.configure(extra={"subsystem": "-"})
+    # Subsystems filter by their own levels, the sink only has to let the most verbose of them through.
+    lowest = min(logger.level(name).no for name in [level, *(levels or {}).values()])
+    logger.add(_writer, level=lowest, format=FORMAT, colorize=False)
+
+    _default_level = logger.level(level).no
+    for subsystem in _subsystems.values():
+        subsystem.configure(level=level, sample_rate=1.0)
+    for name, subsystem_level in (levels or {}).items():
+        get_logger(name).configure(level=subsystem_level)
+    for name, sample_rate in (sample_rates or {}).items():
+        get_logger(name).configure(sample_rate=sample_rate)
+
+
+def is_configured() -> bool:
+    return _writer is not None
+
+
+def flush_logs() -> None:
+    """Wait until all logged messages are written."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def stop_logging() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+atexit.register(stop_logging)